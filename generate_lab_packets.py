@@ -5,20 +5,20 @@ Reads go_now candidates from feasibility_rankings.json, generates detailed
 experiment designs for each, and outputs go_now_lab_packets.json.
 
 Usage:
-    python generate_lab_packets.py [--budget 2.0] [--force]
+    python generate_lab_packets.py [--budget 2.0] [--force] [--concurrency 5]
 """
 
 import argparse
 import asyncio
-import json
 import logging
 import sys
 from datetime import datetime
 from pathlib import Path
 
 import anthropic
+import orjson
 
-from pipeline import CostTracker, BudgetExceeded, RESULTS_DIR
+from pipeline import CostTracker, BudgetExceeded, RESULTS_DIR, load_config
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)-8s | %(message)s")
 logger = logging.getLogger("lab_packets")
@@ -46,8 +46,12 @@ EVIDENCE NEEDED:
 
 RELEVANT DISCIPLINES: {disciplines}
 
-Generate a JSON lab packet with this exact structure:
-{{
+"""
+
+# Static remainder of the prompt: appended as-is, so its JSON braces need no escaping
+LAB_PACKET_PROMPT_SCHEMA = """\
+Generate a lab packet with this structure:
+{
   "title": "concise experiment title (< 15 words)",
   "objective": "one-sentence goal of the experiment",
   "readouts": [
@@ -55,7 +59,7 @@ Generate a JSON lab packet with this exact structure:
     "Secondary: supporting measurement 1",
     "Secondary: supporting measurement 2"
   ],
-  "design": {{
+  "design": {
     "overview": "1-2 sentence experimental strategy",
     "work_packages": [
       "WP1: first phase of work",
@@ -74,33 +78,33 @@ Generate a JSON lab packet with this exact structure:
       "Quantitative threshold for success criterion 2"
     ],
     "estimated_timeline_weeks": 12
-  }},
+  },
   "materials": [
-    {{
+    {
       "item": "specific reagent or equipment name",
       "supplier": "vendor name",
       "catalog_or_id": "catalog number",
       "link": "https://vendor-website.com/product/catalog-number",
       "purpose": "what it's used for in this experiment"
-    }}
+    }
   ],
-  "estimated_direct_cost_usd": {{
+  "estimated_direct_cost_usd": {
     "low": 5000,
     "high": 15000,
     "scope": "What's included and excluded in the estimate"
-  }},
+  },
   "protocol_references": [
-    {{
+    {
       "title": "published protocol or method paper title",
       "use": "how this reference informs the experiment design"
-    }}
+    }
   ],
   "handoff_package_for_lab": [
     "Deliverable 1 the lab needs before starting",
     "Deliverable 2",
     "Deliverable 3"
   ]
-}}
+}
 
 Be specific about:
 - Real vendor names, plausible catalog numbers, and direct product page URLs for key reagents
@@ -108,50 +112,102 @@ Be specific about:
 - Quantitative success criteria (fold changes, p-values, thresholds)
 - Appropriate controls for the experimental system
 
-Respond with JSON only. No markdown fences.
+Return the packet by calling the generate_lab_packet tool.
 """
 
 
+def _object(properties: dict, required: list[str] | None = None) -> dict:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties) if required is None else required,
+    }
+
+
+_STR = {"type": "string"}
+_STR_LIST = {"type": "array", "items": _STR}
+
+# Forced tool call: the API returns the packet as already-parsed tool input
+LAB_PACKET_TOOL = {
+    "name": "generate_lab_packet",
+    "description": "Record the lab packet designed for the target sub-question.",
+    "input_schema": _object({
+        "title": _STR,
+        "objective": _STR,
+        "readouts": _STR_LIST,
+        "design": _object({
+            "overview": _STR,
+            "work_packages": _STR_LIST,
+            "controls": _STR_LIST,
+            "sample_size_plan": _STR,
+            "success_criteria": _STR_LIST,
+            "estimated_timeline_weeks": {"type": "number"},
+        }),
+        "materials": {
+            "type": "array",
+            "items": _object(
+                {
+                    "item": _STR,
+                    "supplier": _STR,
+                    "catalog_or_id": _STR,
+                    "link": _STR,
+                    "purpose": _STR,
+                },
+                required=["item", "supplier", "catalog_or_id", "purpose"],
+            ),
+        },
+        "estimated_direct_cost_usd": _object({
+            "low": {"type": "number"},
+            "high": {"type": "number"},
+            "scope": _STR,
+        }),
+        "protocol_references": {
+            "type": "array",
+            "items": _object({"title": _STR, "use": _STR}),
+        },
+        "handoff_package_for_lab": _STR_LIST,
+    }),
+}
+
+
 def load_go_now_candidates() -> list[dict]:
     """Load GO NOW candidates from feasibility rankings."""
-    with open(RANKINGS_PATH) as f:
-        rankings = json.load(f)
-
-    candidates = []
-    for prob in rankings["ranked_problems"]:
-        if prob.get("decision_bucket") != "go_now":
-            continue
+    rankings = orjson.loads(RANKINGS_PATH.read_bytes())
+
+    # Pair each go_now problem with its best (first) go_now sub-question
+    go_now = (
+        (prob, next(
+            (sq for sq in prob.get("sub_question_scores", [])
+             if sq.get("decision") == "go_now"),
+            None,
+        ))
+        for prob in rankings["ranked_problems"]
+        if prob.get("decision_bucket") == "go_now"
+    )
 
-        # Find the best go_now sub-question
-        best_sq = None
-        for sq in prob.get("sub_question_scores", []):
-            if sq.get("decision") == "go_now":
-                best_sq = sq
-                break
-
-        if best_sq:
-            candidates.append({
-                "problem_statement": prob["problem_statement"],
-                "domain": prob["domain"],
-                "subdomain": prob.get("subdomain", ""),
-                "scope": prob.get("scope", "medium"),
-                "sources": prob.get("sources", []),
-                "best_score": prob["best_score"],
-                "best_confidence": prob["best_confidence"],
-                "sub_question": best_sq["question"],
-                "evidence_needed": best_sq.get("evidence_needed", ""),
-                "disciplines": best_sq.get("disciplines", []),
-            })
-
-    return candidates
+    return [
+        {
+            "problem_statement": prob["problem_statement"],
+            "domain": prob["domain"],
+            "subdomain": prob.get("subdomain", ""),
+            "scope": prob.get("scope", "medium"),
+            "sources": prob.get("sources", []),
+            "best_score": prob["best_score"],
+            "best_confidence": prob["best_confidence"],
+            "sub_question": best_sq["question"],
+            "evidence_needed": best_sq.get("evidence_needed", ""),
+            "disciplines": best_sq.get("disciplines", []),
+        }
+        for prob, best_sq in go_now
+        if best_sq
+    ]
 
 
 def load_existing_packets() -> dict:
     """Load existing lab packets, keyed by problem statement."""
     if not OUTPUT_PATH.exists():
         return {}
-    with open(OUTPUT_PATH) as f:
-        data = json.load(f)
+    data = orjson.loads(OUTPUT_PATH.read_bytes())
     return {
         exp["maps_to_problem_statement"]: exp
         for exp in data.get("experiments", [])
@@ -174,13 +230,15 @@ async def generate_one_packet(
         sub_question=candidate["sub_question"],
         evidence_needed=candidate["evidence_needed"],
         disciplines=", ".join(candidate.get("disciplines", [])),
-    )
+    ) + LAB_PACKET_PROMPT_SCHEMA
 
     try:
         response = await client.messages.create(
             model=model,
             max_tokens=4000,
             messages=[{"role": "user", "content": prompt}],
+            tools=[LAB_PACKET_TOOL],
+            tool_choice={"type": "tool", "name": LAB_PACKET_TOOL["name"]},
         )
     except Exception as e:
         logger.error("API error for %s: %s", packet_id, e)
@@ -193,23 +251,13 @@ async def generate_one_packet(
         stage="lab_packets",
     )
 
-    if not response.content:
-        logger.warning("Empty response for %s", packet_id)
-        return None
-
-    text = response.content[0].text.strip()
-    # Strip markdown fences if present
-    if text.startswith("```"):
-        text = text.split("\n", 1)[1] if "\n" in text else text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
-        text = text.strip()
-
-    try:
-        packet = json.loads(text)
-    except json.JSONDecodeError as e:
-        logger.error("Failed to parse JSON for %s: %s", packet_id, e)
-        logger.debug("Raw response: %s", text[:500])
+    packet = next(
+        (block.input for block in response.content if block.type == "tool_use"),
+        None,
+    )
+    if not packet:
+        logger.warning("No lab packet tool call in response for %s (stop_reason=%s)",
+                       packet_id, response.stop_reason)
         return None
 
     # Wrap with metadata
@@ -232,48 +280,84 @@ async def generate_one_packet(
 
 
 async def generate_all_packets(candidates: list[dict], force: bool = False,
-                                budget: float = 2.0) -> list[dict]:
-    """Generate lab packets for all GO NOW candidates."""
+                                budget: float = 2.0, concurrency: int = 5) -> list[dict]:
+    """Generate lab packets for all GO NOW candidates.
+
+    Requests run concurrently, at most ``concurrency`` in flight. Packet ids
+    are assigned in candidate order once all requests have returned.
+    """
     existing = load_existing_packets()
     cost_tracker = CostTracker(limit=budget)
     client = anthropic.AsyncAnthropic()
+    semaphore = asyncio.Semaphore(concurrency)
+    budget_exceeded = asyncio.Event()
+
+    async def _run(candidate: dict, packet_id: str) -> dict | None:
+        async with semaphore:
+            if budget_exceeded.is_set():
+                return None
+            logger.info("Generating %s: %s", packet_id, candidate["problem_statement"][:80])
+            try:
+                packet = await generate_one_packet(
+                    client, candidate, packet_id, cost_tracker
+                )
+            except BudgetExceeded:
+                if not budget_exceeded.is_set():
+                    logger.error("Budget exceeded. Stopping generation.")
+                budget_exceeded.set()
+                return None
+            return packet
+
+    todo = [
+        c for c in candidates
+        if force or c["problem_statement"] not in existing
+    ]
+    start_id = len(existing) + 1
+    results = await asyncio.gather(*(
+        _run(c, f"opc-go-{start_id + i:03d}") for i, c in enumerate(todo)
+    ))
+    if todo:
+        cost_tracker.log_status()
+    generated = {
+        c["problem_statement"]: packet for c, packet in zip(todo, results)
+    }
 
     packets = []
-    next_id = len(existing) + 1
+    next_id = start_id
 
     for candidate in candidates:
         ps = candidate["problem_statement"]
 
-        if ps in existing and not force:
+        if ps not in generated:
             logger.info("SKIP (already exists): %s", ps[:80])
             packets.append(existing[ps])
             continue
 
-        packet_id = f"opc-go-{next_id:03d}"
-        logger.info("Generating %s: %s", packet_id, ps[:80])
-
-        try:
-            packet = await generate_one_packet(
-                client, candidate, packet_id, cost_tracker
-            )
-        except BudgetExceeded:
-            logger.error("Budget exceeded. Stopping generation.")
-            break
-
+        packet = generated[ps]
         if packet:
+            packet["id"] = f"opc-go-{next_id:03d}"
             packets.append(packet)
             next_id += 1
-            cost_tracker.log_status()
-        else:
+        elif not budget_exceeded.is_set():
             logger.warning("Failed to generate packet for: %s", ps[:80])
 
     return packets
 
 
 def write_output(packets: list[dict]) -> Path:
-    """Write lab packets JSON."""
+    """Write lab packets JSON.
+
+    The previous generated_at stamp is kept when the experiments are
+    unchanged, so a no-op rerun leaves the file (and its diff) untouched.
+    """
+    generated_at = datetime.now().isoformat()
+    if OUTPUT_PATH.exists():
+        previous = orjson.loads(OUTPUT_PATH.read_bytes())
+        if previous.get("experiments") == packets:
+            generated_at = previous.get("generated_at", generated_at)
+
     output = {
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": generated_at,
         "criteria_version": "feasibility_go_no_go_v2",
         "go_now_problem_count": len(packets),
         "notes": [
@@ -284,8 +368,7 @@ def write_output(packets: list[dict]) -> Path:
         "experiments": packets,
     }
 
-    with open(OUTPUT_PATH, "w") as f:
-        json.dump(output, f, indent=2)
+    OUTPUT_PATH.write_bytes(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
     return OUTPUT_PATH
 
@@ -296,7 +379,11 @@ def main():
                         help="Max LLM spend in USD (default: 2.0)")
     parser.add_argument("--force", action="store_true",
                         help="Regenerate packets even if they already exist")
+    parser.add_argument("--concurrency", type=int, default=None,
+                        help="Max concurrent LLM requests "
+                             "(default: llm.max_concurrent_requests from config.yaml)")
     args = parser.parse_args()
+    concurrency = args.concurrency or load_config()["llm"]["max_concurrent_requests"]
 
     candidates = load_go_now_candidates()
     logger.info("Found %d GO NOW candidates", len(candidates))
@@ -308,7 +395,9 @@ def main():
     for i, c in enumerate(candidates, 1):
         logger.info("  %d. %s", i, c["problem_statement"][:80])
 
-    packets = asyncio.run(generate_all_packets(candidates, args.force, args.budget))
+    packets = asyncio.run(
+        generate_all_packets(candidates, args.force, args.budget, concurrency)
+    )
 
     path = write_output(packets)
     logger.info("Wrote %d lab packets to %s", len(packets), path)
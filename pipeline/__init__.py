@@ -1,16 +1,23 @@
 """Open Problem Collector pipeline."""
 
-import json
+import copy
 import logging
 import os
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields, asdict
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+import orjson
 import yaml
+import zstandard
 from dotenv import load_dotenv
 
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeLoader as YamlLoader
+
 load_dotenv()
 
 # ── Path constants ──────────────────────────────────────────────────────────
@@ -48,6 +55,7 @@ def setup_logging(run_id: str | None = None) -> logging.Logger:
         fh = logging.FileHandler(LOGS_DIR / f"{run_id}.log")
         fh.setLevel(logging.DEBUG)
         fh.setFormatter(fmt)
+        # Attached directly so forked pool workers write to the file too
         logger.addHandler(fh)
 
     return logger
@@ -55,22 +63,33 @@ def setup_logging(run_id: str | None = None) -> logging.Logger:
 
 # ── Config loader ───────────────────────────────────────────────────────────
 
+# Parsed YAML keyed by (path, mtime_ns); editing a file invalidates its entry
+_YAML_CACHE: dict[tuple[str, int], object] = {}
+
+
+def load_yaml(path: Path):
+    """Parse a YAML file once per modification, returning a private copy."""
+    path = Path(path)
+    key = (str(path), path.stat().st_mtime_ns)
+    if key not in _YAML_CACHE:
+        with open(path) as f:
+            _YAML_CACHE[key] = yaml.load(f, Loader=YamlLoader)
+    # Deep copy so callers can't mutate the cached value
+    return copy.deepcopy(_YAML_CACHE[key])
+
+
 def load_config(path: Path | None = None) -> dict:
     """Load config.yaml from project root."""
-    path = path or ROOT_DIR / "config.yaml"
-    with open(path) as f:
-        return yaml.safe_load(f)
+    return load_yaml(path or ROOT_DIR / "config.yaml")
 
 
 def load_signal_phrases(path: Path | None = None) -> dict:
-    path = path or CONFIG_DIR / "signal_phrases.yaml"
-    with open(path) as f:
-        return yaml.safe_load(f)
+    return load_yaml(path or CONFIG_DIR / "signal_phrases.yaml")
 
 
 # ── Source dataclass ────────────────────────────────────────────────────────
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     """Core data object carried through all pipeline stages."""
     # Identity
@@ -97,69 +116,107 @@ class Source:
     problems: list[dict] = field(default_factory=list)
     # Each: {problem_statement, domain, subdomain, scope, sub_questions, ...}
 
-    def to_dict(self) -> dict:
-        return asdict(self)
+    # Serialized form, reused until a field is reassigned. Stages replace
+    # container fields rather than mutating them in place once serialized.
+    _json_cache: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name != "_json_cache":
+            object.__setattr__(self, "_json_cache", None)
 
-    def to_json(self) -> str:
-        return json.dumps(self.to_dict(), default=str)
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        del d["_json_cache"]
+        return d
+
+    def to_json(self) -> bytes:
+        if self._json_cache is not None:
+            return self._json_cache
+        # Fields are JSON-native already, so skip asdict's recursive copy
+        d = {name: getattr(self, name) for name in _SOURCE_FIELD_NAMES}
+        # Don't store the text twice when full_text is just the joined sections;
+        # from_dict rebuilds it from the missing key
+        if self.sections and self.full_text == "\n\n".join(self.sections.values()):
+            del d["full_text"]
+        self._json_cache = orjson.dumps(d, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return self._json_cache
 
     @classmethod
     def from_dict(cls, d: dict) -> "Source":
-        return cls(**{k: v for k, v in d.items() if k in cls.__dataclass_fields__})
+        source = cls(**{k: v for k, v in d.items() if k in _SOURCE_FIELDS})
+        if "full_text" not in d and source.sections:
+            source.full_text = "\n\n".join(source.sections.values())
+        return source
+
+
+# Declaration order, so serialized records always lead with source_id
+_SOURCE_FIELD_NAMES = tuple(f.name for f in fields(Source) if f.init)
+_SOURCE_FIELDS = frozenset(_SOURCE_FIELD_NAMES)
 
 
 # ── Checkpoint helpers ──────────────────────────────────────────────────────
 
+# Stage checkpoints are zstd-compressed JSONL; plain .jsonl from older runs
+# is still read. Incremental checkpoints stay plain so they can be appended.
+_CHECKPOINT_SUFFIXES = (".jsonl.zst", ".jsonl")
+
+
+def _find_checkpoint(run_id: str, stage: str) -> Path | None:
+    for suffix in _CHECKPOINT_SUFFIXES:
+        path = CHECKPOINTS_DIR / f"{run_id}_{stage}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
 def write_checkpoint(run_id: str, stage: str, sources: list[Source]) -> Path:
-    """Write a list of Sources to a checkpoint JSONL file."""
-    path = CHECKPOINTS_DIR / f"{run_id}_{stage}.jsonl"
-    with open(path, "w") as f:
-        for s in sources:
-            f.write(s.to_json() + "\n")
+    """Write a list of Sources to a compressed checkpoint JSONL file."""
+    path = CHECKPOINTS_DIR / f"{run_id}_{stage}.jsonl.zst"
+    payload = b"".join(s.to_json() + b"\n" for s in sources)
+    path.write_bytes(zstandard.ZstdCompressor(level=3, threads=-1).compress(payload))
     return path
 
 
 def load_checkpoint(run_id: str, stage: str) -> list[Source] | None:
     """Load sources from a checkpoint file, or None if it doesn't exist."""
-    path = CHECKPOINTS_DIR / f"{run_id}_{stage}.jsonl"
-    if not path.exists():
+    path = _find_checkpoint(run_id, stage)
+    if path is None:
         return None
-    sources = []
-    with open(path) as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                sources.append(Source.from_dict(json.loads(line)))
-    return sources
+    data = path.read_bytes()
+    if path.suffix == ".zst":
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return [Source.from_dict(orjson.loads(line))
+            for line in data.splitlines() if line.strip()]
 
 
 def checkpoint_exists(run_id: str, stage: str) -> bool:
-    path = CHECKPOINTS_DIR / f"{run_id}_{stage}.jsonl"
-    return path.exists()
+    return _find_checkpoint(run_id, stage) is not None
 
 
 def write_incremental_checkpoint(run_id: str, stage: str, sources: list[Source]) -> Path:
     """Append sources to an incremental checkpoint (for LLM stages)."""
     path = CHECKPOINTS_DIR / f"{run_id}_{stage}_incremental.jsonl"
-    with open(path, "a") as f:
-        for s in sources:
-            f.write(s.to_json() + "\n")
+    with open(path, "ab") as f:
+        f.write(b"".join(s.to_json() + b"\n" for s in sources))
     return path
 
 
-def load_incremental_checkpoint(run_id: str, stage: str) -> set[str]:
-    """Return set of source_ids already processed in incremental checkpoint."""
+def load_incremental_sources(run_id: str, stage: str) -> dict[str, Source]:
+    """Return the sources in an incremental checkpoint, keyed by source_id.
+
+    A source written more than once keeps its first position and latest value.
+    """
     path = CHECKPOINTS_DIR / f"{run_id}_{stage}_incremental.jsonl"
     if not path.exists():
-        return set()
-    ids = set()
-    with open(path) as f:
+        return {}
+    sources = {}
+    with open(path, "rb") as f:
         for line in f:
-            line = line.strip()
-            if line:
-                d = json.loads(line)
-                ids.add(d["source_id"])
-    return ids
+            if line.strip():
+                source = Source.from_dict(orjson.loads(line))
+                sources[source.source_id] = source
+    return sources
 
 
 def generate_run_id() -> str:
@@ -175,6 +232,20 @@ MODEL_PRICING = {
     "claude-opus-4-6":           {"input": 15.00, "output": 75.00},
 }
 
+# Per-token rates derived from MODEL_PRICING; unknown models bill at Sonnet rates
+MODEL_RATES = {
+    model: {"input": p["input"] / 1_000_000, "output": p["output"] / 1_000_000}
+    for model, p in MODEL_PRICING.items()
+}
+_DEFAULT_RATES = {"input": 3.0 / 1_000_000, "output": 15.0 / 1_000_000}
+
+# Message Batches API requests bill at half the standard rates
+BATCH_DISCOUNT = 0.5
+
+# Prompt caching: writing a cached prefix costs 1.25x input, reading it 0.1x
+CACHE_WRITE_MULTIPLIER = 1.25
+CACHE_READ_MULTIPLIER = 0.1
+
 
 class BudgetExceeded(Exception):
     """Raised when cumulative LLM spend exceeds the configured threshold."""
@@ -192,15 +263,19 @@ class CostTracker:
         self._logger = logging.getLogger("collector.cost")
 
     def record(self, model: str, input_tokens: int, output_tokens: int,
-               stage: str = "") -> float:
+               stage: str = "", batch: bool = False,
+               cache_write_tokens: int = 0, cache_read_tokens: int = 0) -> float:
         """Record token usage from one API call. Returns the call cost.
 
+        input_tokens excludes prompt-cache tokens, which are billed separately
+        via cache_write_tokens/cache_read_tokens. batch=True bills the call at
+        the Message Batches discount.
         Raises BudgetExceeded if cumulative spend exceeds the limit.
         """
-        pricing = MODEL_PRICING.get(model, {"input": 3.0, "output": 15.0})
-        cost = (input_tokens * pricing["input"] + output_tokens * pricing["output"]) / 1_000_000
+        cost = self.estimate(model, input_tokens, output_tokens, batch,
+                             cache_write_tokens, cache_read_tokens)
 
-        self.total_input_tokens += input_tokens
+        self.total_input_tokens += input_tokens + cache_write_tokens + cache_read_tokens
         self.total_output_tokens += output_tokens
         self.total_cost += cost
         if stage:
@@ -217,6 +292,25 @@ class CostTracker:
 
         return cost
 
+    @staticmethod
+    def estimate(model: str, input_tokens: int, output_tokens: int, batch: bool = False,
+                 cache_write_tokens: int = 0, cache_read_tokens: int = 0) -> float:
+        """Return what a call with this usage costs, without recording it."""
+        rates = MODEL_RATES.get(model, _DEFAULT_RATES)
+        cost = (
+            input_tokens * rates["input"]
+            + cache_write_tokens * rates["input"] * CACHE_WRITE_MULTIPLIER
+            + cache_read_tokens * rates["input"] * CACHE_READ_MULTIPLIER
+            + output_tokens * rates["output"]
+        )
+        if batch:
+            cost *= BATCH_DISCOUNT
+        return cost
+
+    @property
+    def remaining(self) -> float:
+        return max(self.limit - self.total_cost, 0.0)
+
     def summary(self) -> dict:
         return {
             "total_cost": round(self.total_cost, 4),
@@ -10,10 +10,8 @@ This module follows the same pattern as ingest_workshops.py.
 import logging
 from pathlib import Path
 
-import yaml
-
-from pipeline import Source, DATA_DIR, load_config
-from pipeline.pdf_utils import extract_text_from_pdf, detect_sections
+from pipeline import Source, DATA_DIR, load_config, load_yaml
+from pipeline.pdf_utils import extract_text_and_sections, list_pdfs, map_pdfs
 
 logger = logging.getLogger("collector.ingest_nas")
 
@@ -38,16 +36,18 @@ def ingest_nas_reports(config: dict | None = None) -> list[Source]:
         logger.warning("Download NAS PDFs from nationalacademies.org and place them here.")
         return []
 
-    pdf_files = sorted(nas_dir.glob("*.pdf"))
+    pdf_files = list_pdfs(nas_dir)
     if not pdf_files:
         logger.warning("No PDF files found in %s", nas_dir)
         return []
 
     logger.info("Found %d PDF files in %s", len(pdf_files), nas_dir)
 
+    # Sidecars are read here so load_yaml's cache outlives the worker processes
+    metadata = [_load_metadata(pdf_path) for pdf_path in pdf_files]
+
     sources = []
-    for pdf_path in pdf_files:
-        source = _ingest_one(pdf_path)
+    for pdf_path, source in zip(pdf_files, map_pdfs(_ingest_one, pdf_files, metadata)):
         if source and source.full_text:
             sources.append(source)
         else:
@@ -57,11 +57,12 @@ def ingest_nas_reports(config: dict | None = None) -> list[Source]:
     return sources
 
 
-def _ingest_one(pdf_path: Path) -> Source | None:
+def _ingest_one(pdf_path: Path, metadata: dict | None = None) -> Source | None:
     """Ingest a single NAS report PDF."""
     logger.info("Ingesting: %s", pdf_path.name)
 
-    metadata = _load_metadata(pdf_path)
+    if metadata is None:
+        metadata = _load_metadata(pdf_path)
     source_id = metadata.get("source_id", f"nas-{pdf_path.stem}")
 
     source = Source(
@@ -75,12 +76,12 @@ def _ingest_one(pdf_path: Path) -> Source | None:
         pdf_path=str(pdf_path),
     )
 
-    text = extract_text_from_pdf(pdf_path)
+    text, sections = extract_text_and_sections(pdf_path)
     if not text:
         return None
 
     source.full_text = text
-    source.sections = detect_sections(text)
+    source.sections = sections
 
     if source.sections:
         logger.info("  Detected %d sections: %s",
@@ -98,9 +99,8 @@ def _load_metadata(pdf_path: Path) -> dict:
         return {}
 
     try:
-        with open(yaml_path) as f:
-            data = yaml.safe_load(f)
-            return data if isinstance(data, dict) else {}
+        data = load_yaml(yaml_path)
+        return data if isinstance(data, dict) else {}
     except Exception as e:
         logger.warning("Failed to load metadata from %s: %s", yaml_path, e)
         return {}
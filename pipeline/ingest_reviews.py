@@ -1,20 +1,73 @@
 """Stage 1a: eLife peer review ingestion via API + HTML scraping."""
 
 import asyncio
+import hashlib
 import logging
 import re
+import time
 from datetime import datetime
+from pathlib import Path
 
 import httpx
+import orjson
 from bs4 import BeautifulSoup
 
-from pipeline import Source, load_config
+from pipeline import Source, CHECKPOINTS_DIR, load_config
 
 logger = logging.getLogger("collector.ingest_reviews")
 
 ELIFE_API = "https://api.elifesciences.org"
 ELIFE_WEB = "https://elifesciences.org"
 
+_PEER_REVIEW_ID_RE = re.compile(r"^peer-review-\d+$")
+
+
+SEARCH_PAGE_SIZE = 20  # eLife search API maximum
+
+
+async def _fetch_subject_preprints(
+    client: httpx.AsyncClient,
+    subject: str,
+    max_per_subject: int,
+) -> list[dict]:
+    """Page through one subject's reviewed preprints, newest first."""
+    items = []
+    page = 1
+    while len(items) < max_per_subject:
+        params = {
+            "subject[]": subject,
+            "type[]": "reviewed-preprint",
+            "per-page": SEARCH_PAGE_SIZE,
+            "page": page,
+            "order": "desc",
+        }
+        resp = await client.get(f"{ELIFE_API}/search", params=params)
+        resp.raise_for_status()
+        data = resp.json()
+
+        batch = data.get("items", [])
+        if not batch:
+            break
+
+        for item in batch:
+            items.append({
+                "id": item["id"],
+                "version": item.get("version", 1),
+                "title": item.get("title", ""),
+                "authorLine": item.get("authorLine", ""),
+                "published": item.get("published", ""),
+                "subjects": [s["id"] for s in item.get("subjects", [])],
+                "doi": item.get("doi", ""),
+            })
+
+        if page * SEARCH_PAGE_SIZE >= data.get("total", 0):
+            break
+        page += 1
+
+    items = items[:max_per_subject]
+    logger.info("Subject %s: fetched %d preprints", subject, len(items))
+    return items
+
 
 async def fetch_reviewed_preprint_ids(
     client: httpx.AsyncClient,
@@ -24,68 +77,82 @@ async def fetch_reviewed_preprint_ids(
     """Fetch reviewed preprint metadata from eLife search API.
 
     Returns list of dicts: {id, version, title, authorLine, published, subjects, doi}.
-    Deduplicates across subjects.
+    Subjects are fetched concurrently, then deduplicated in subject order.
     """
+    per_subject = await asyncio.gather(
+        *(_fetch_subject_preprints(client, subject, max_per_subject) for subject in subjects)
+    )
+
     seen = set()
     items = []
-
-    for subject in subjects:
-        page = 1
-        collected = 0
-        while collected < max_per_subject:
-            per_page = min(20, max_per_subject - collected)
-            params = {
-                "subject[]": subject,
-                "type[]": "reviewed-preprint",
-                "per-page": per_page,
-                "page": page,
-                "order": "desc",
-            }
-            resp = await client.get(f"{ELIFE_API}/search", params=params)
-            resp.raise_for_status()
-            data = resp.json()
-
-            batch = data.get("items", [])
-            if not batch:
-                break
-
-            for item in batch:
-                msid = item["id"]
-                if msid not in seen:
-                    seen.add(msid)
-                    items.append({
-                        "id": msid,
-                        "version": item.get("version", 1),
-                        "title": item.get("title", ""),
-                        "authorLine": item.get("authorLine", ""),
-                        "published": item.get("published", ""),
-                        "subjects": [s["id"] for s in item.get("subjects", [])],
-                        "doi": item.get("doi", ""),
-                    })
-                    collected += 1
-
-            page += 1
-            total = data.get("total", 0)
-            if page * per_page >= total:
-                break
-
-        logger.info("Subject %s: fetched %d preprints", subject, collected)
+    for batch in per_subject:
+        for item in batch:
+            if item["id"] not in seen:
+                seen.add(item["id"])
+                items.append(item)
 
     logger.info("Total unique reviewed preprints: %d", len(items))
     return items
 
 
+def _listing_cache_path(subjects: list[str], max_per_subject: int) -> Path:
+    key = hashlib.sha1(
+        orjson.dumps({"subjects": subjects, "max": max_per_subject})
+    ).hexdigest()[:16]
+    return CHECKPOINTS_DIR / f"elife_ids_{key}.json"
+
+
+async def load_preprint_listing(
+    client: httpx.AsyncClient,
+    subjects: list[str],
+    max_per_subject: int = 50,
+    ttl: float = 3600,
+) -> list[dict]:
+    """Return the reviewed preprint listing, reusing a cached copy younger than ttl seconds."""
+    path = _listing_cache_path(subjects, max_per_subject)
+    if path.exists() and time.time() - path.stat().st_mtime < ttl:
+        items = orjson.loads(path.read_bytes())
+        logger.info("Using cached eLife listing (%d preprints): %s", len(items), path.name)
+        return items
+
+    items = await fetch_reviewed_preprint_ids(client, subjects, max_per_subject)
+    if items:
+        path.write_bytes(orjson.dumps(items))
+    return items
+
+
+class RateLimiter:
+    """Space request starts at least `interval` seconds apart across tasks."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait(self) -> None:
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+                now = self._next_start
+            self._next_start = now + self.interval
+
+
 async def fetch_review_text(
     client: httpx.AsyncClient,
     msid: int | str,
     version: int,
     semaphore: asyncio.Semaphore,
+    limiter: RateLimiter | None = None,
 ) -> dict[str, str] | None:
     """Fetch and parse peer review text from an eLife reviewed preprint.
 
     Returns dict of {section_id: text} keyed by peer-review-N, or None on failure.
     """
     async with semaphore:
+        if limiter:
+            await limiter.wait()
         url = f"{ELIFE_WEB}/reviewed-preprints/{msid}v{version}/reviews"
         try:
             resp = await client.get(url, follow_redirects=True)
@@ -106,14 +173,17 @@ def _parse_review_html(html: str, msid: int | str) -> dict[str, str] | None:
     from the review-content_body div inside each.
     Returns dict keyed by section id (e.g. 'peer-review-0').
     """
-    soup = BeautifulSoup(html, "html.parser")
+    # Pages without public reviews have no peer-review ids; skip the parse
+    if "peer-review-" not in html:
+        logger.debug("No review sections found for %s", msid)
+        return None
+
+    soup = BeautifulSoup(html, "lxml")
 
     sections = {}
 
     # Find all peer review sections (peer-review-0, peer-review-1, ...)
-    review_sections = soup.find_all(
-        id=re.compile(r"^peer-review-\d+$")
-    )
+    review_sections = soup.find_all(id=_PEER_REVIEW_ID_RE)
 
     for section in review_sections:
         section_id = section.get("id", "unknown")
@@ -125,7 +195,8 @@ def _parse_review_html(html: str, msid: int | str) -> dict[str, str] | None:
         if not paragraphs:
             continue
 
-        section_text = "\n\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+        texts = (p.get_text(strip=True) for p in paragraphs)
+        section_text = "\n\n".join(t for t in texts if t)
         if section_text:
             sections[section_id] = section_text
 
@@ -149,62 +220,76 @@ async def ingest_elife_reviews(config: dict | None = None) -> list[Source]:
     max_per_subject = elife_cfg.get("max_per_subject", 50)
     rate_limit_delay = elife_cfg.get("rate_limit_delay", 1.0)
 
-    # Concurrent HTML fetches (polite: max 2 at a time)
-    semaphore = asyncio.Semaphore(2)
+    max_concurrent = elife_cfg.get("max_concurrent_fetches", 8)
+    listing_ttl = elife_cfg.get("listing_cache_ttl", 3600)
+
+    # Concurrent HTML fetches; the limiter keeps request starts
+    # rate_limit_delay apart so eLife still sees a polite request rate
+    semaphore = asyncio.Semaphore(max_concurrent)
+    limiter = RateLimiter(rate_limit_delay)
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    # HTTP/2 multiplexes the concurrent page fetches over pooled connections
+    limits = httpx.Limits(max_connections=max_concurrent,
+                          max_keepalive_connections=max_concurrent)
+    async with httpx.AsyncClient(http2=True, timeout=30.0, limits=limits) as client:
         # Stage 1: Fetch preprint metadata
         logger.info("Fetching eLife reviewed preprint listings...")
-        preprints = await fetch_reviewed_preprint_ids(client, subjects, max_per_subject)
+        preprints = await load_preprint_listing(client, subjects, max_per_subject, listing_ttl)
 
         if not preprints:
             logger.warning("No eLife preprints found")
             return []
 
-        # Stage 2: Fetch review text for each preprint
+        # Stage 2: Fetch review text for all preprints concurrently
         logger.info("Fetching review text for %d preprints...", len(preprints))
-        sources = []
-
-        for i, pp in enumerate(preprints):
-            msid = pp["id"]
-            version = pp["version"]
-            source_id = f"elife-{msid}v{version}"
-
-            review_sections = await fetch_review_text(client, msid, version, semaphore)
-
-            if not review_sections:
-                logger.debug("No review text for %s, skipping", source_id)
-                continue
-
-            # Parse authors from authorLine (e.g., "Smith, Jones et al.")
-            authors = [a.strip() for a in pp.get("authorLine", "").split(",")] if pp.get("authorLine") else []
-
-            published = pp.get("published", "")
-            if published:
-                try:
-                    published = datetime.fromisoformat(published.replace("Z", "+00:00")).strftime("%Y-%m-%d")
-                except (ValueError, TypeError):
-                    pass
-
-            source = Source(
-                source_id=source_id,
-                source_type="elife_review",
-                title=pp.get("title", ""),
-                authors=authors,
-                organization="eLife",
-                date_published=published,
-                url=f"{ELIFE_WEB}/reviewed-preprints/{msid}v{version}",
-                full_text="\n\n".join(review_sections.values()),
-                sections=review_sections,
+        fetched = 0
+
+        async def _fetch(pp: dict) -> dict[str, str] | None:
+            nonlocal fetched
+            review_sections = await fetch_review_text(
+                client, pp["id"], pp["version"], semaphore, limiter,
             )
-            sources.append(source)
+            fetched += 1
+            if fetched % 10 == 0:
+                logger.info("  Fetched reviews: %d/%d", fetched, len(preprints))
+            return review_sections
+
+        results = await asyncio.gather(*(_fetch(pp) for pp in preprints))
 
-            if (i + 1) % 10 == 0:
-                logger.info("  Fetched reviews: %d/%d (%d with text)",
-                            i + 1, len(preprints), len(sources))
+    sources = []
+    for pp, review_sections in zip(preprints, results):
+        msid = pp["id"]
+        version = pp["version"]
+        source_id = f"elife-{msid}v{version}"
+
+        if not review_sections:
+            logger.debug("No review text for %s, skipping", source_id)
+            continue
 
-            # Rate limit
-            await asyncio.sleep(rate_limit_delay)
+        # Parse authors from authorLine (e.g., "Smith, Jones et al.")
+        author_line = pp.get("authorLine") or ""
+        authors = [a for a in (s.strip() for s in author_line.split(",")) if a]
+
+        published = pp.get("published", "")
+        # Already a bare YYYY-MM-DD date: nothing to normalize
+        if published and not (len(published) == 10 and published[4] == "-"):
+            try:
+                published = datetime.fromisoformat(published.replace("Z", "+00:00")).strftime("%Y-%m-%d")
+            except (ValueError, TypeError):
+                pass
+
+        source = Source(
+            source_id=source_id,
+            source_type="elife_review",
+            title=pp.get("title", ""),
+            authors=authors,
+            organization="eLife",
+            date_published=published,
+            url=f"{ELIFE_WEB}/reviewed-preprints/{msid}v{version}",
+            full_text="\n\n".join(review_sections.values()),
+            sections=review_sections,
+        )
+        sources.append(source)
 
     logger.info("eLife ingestion complete: %d/%d preprints yielded review text",
                 len(sources), len(preprints))
@@ -3,10 +3,8 @@
 import logging
 from pathlib import Path
 
-import yaml
-
-from pipeline import Source, WORKSHOPS_DIR, load_config
-from pipeline.pdf_utils import extract_text_from_pdf, detect_sections
+from pipeline import Source, WORKSHOPS_DIR, load_config, load_yaml
+from pipeline.pdf_utils import extract_text_and_sections, list_pdfs, map_pdfs
 
 logger = logging.getLogger("collector.ingest_workshops")
 
@@ -24,16 +22,18 @@ def ingest_workshops(config: dict | None = None) -> list[Source]:
         logger.warning("Workshops directory does not exist: %s", workshops_dir)
         return []
 
-    pdf_files = sorted(workshops_dir.glob("*.pdf"))
+    pdf_files = list_pdfs(workshops_dir)
     if not pdf_files:
         logger.warning("No PDF files found in %s", workshops_dir)
         return []
 
     logger.info("Found %d PDF files in %s", len(pdf_files), workshops_dir)
 
+    # Sidecars are read here so load_yaml's cache outlives the worker processes
+    metadata = [_load_metadata(pdf_path) for pdf_path in pdf_files]
+
     sources = []
-    for pdf_path in pdf_files:
-        source = _ingest_one(pdf_path)
+    for pdf_path, source in zip(pdf_files, map_pdfs(_ingest_one, pdf_files, metadata)):
         if source and source.full_text:
             sources.append(source)
         else:
@@ -43,12 +43,13 @@ def ingest_workshops(config: dict | None = None) -> list[Source]:
     return sources
 
 
-def _ingest_one(pdf_path: Path) -> Source | None:
+def _ingest_one(pdf_path: Path, metadata: dict | None = None) -> Source | None:
     """Ingest a single workshop report PDF."""
     logger.info("Ingesting: %s", pdf_path.name)
 
     # Load optional metadata sidecar
-    metadata = _load_metadata(pdf_path)
+    if metadata is None:
+        metadata = _load_metadata(pdf_path)
 
     # Generate source_id from filename
     source_id = metadata.get("source_id", pdf_path.stem)
@@ -65,12 +66,12 @@ def _ingest_one(pdf_path: Path) -> Source | None:
     )
 
     # Extract text
-    text = extract_text_from_pdf(pdf_path)
+    text, sections = extract_text_and_sections(pdf_path)
     if not text:
         return None
 
     source.full_text = text
-    source.sections = detect_sections(text)
+    source.sections = sections
 
     if source.sections:
         logger.info("  Detected %d sections: %s",
@@ -92,9 +93,8 @@ def _load_metadata(pdf_path: Path) -> dict:
         return {}
 
     try:
-        with open(yaml_path) as f:
-            data = yaml.safe_load(f)
-            return data if isinstance(data, dict) else {}
+        data = load_yaml(yaml_path)
+        return data if isinstance(data, dict) else {}
     except Exception as e:
         logger.warning("Failed to load metadata from %s: %s", yaml_path, e)
         return {}
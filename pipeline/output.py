@@ -1,16 +1,31 @@
 """Stage 6: SQLite output + JSON feed export."""
 
-import json
 import sqlite3
 import urllib.parse
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime
 from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
 
+import orjson
+
 from pipeline import RESULTS_DIR, Source
 
+try:
+    from rapidfuzz import fuzz, process
+except ImportError:  # fall back to difflib's pure-Python matcher
+    fuzz = process = None
+
 DB_PATH = RESULTS_DIR / "collector.db"
 
+# Problems per chunk when streaming a feed export; each chunk's sources and
+# sub-questions are fetched in one pair of queries
+EXPORT_CHUNK_SIZE = 500
+
 SCHEMA = """
 CREATE TABLE IF NOT EXISTS sources (
     id TEXT PRIMARY KEY,
@@ -69,44 +84,199 @@ CREATE TABLE IF NOT EXISTS pipeline_runs (
 );
 """
 
+# Indexes for the per-row lookups in upsert_problem, upsert_sub_question and the exporters
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_run_problems_run_id ON run_problems(run_id);
+CREATE INDEX IF NOT EXISTS idx_run_problems_problem_id ON run_problems(problem_id);
+DROP INDEX IF EXISTS idx_problems_statement;
+CREATE INDEX IF NOT EXISTS idx_problems_statement_ne ON open_problems(canonical_statement)
+    WHERE canonical_statement <> '';
+CREATE INDEX IF NOT EXISTS idx_sub_questions_problem_question ON sub_questions(problem_id, question);
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_run_id ON pipeline_runs(run_id);
+"""
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MiB memory-mapped I/O
+)
+
 
 def init_db(db_path: Path | None = None) -> sqlite3.Connection:
     """Initialize the database and return a connection."""
     db_path = db_path or DB_PATH
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(db_path))
+    # Autocommit; batched writes open their own transaction via bulk_write()
+    conn = sqlite3.connect(str(db_path), isolation_level=None)
     conn.row_factory = sqlite3.Row
+    # WAL + NORMAL sync: commits no longer fsync the main DB, readers don't block writers
+    for pragma in PRAGMAS:
+        conn.execute(pragma)
     conn.executescript(SCHEMA)
-    conn.execute(
-        "CREATE INDEX IF NOT EXISTS idx_run_problems_run_id ON run_problems(run_id)"
-    )
+    conn.executescript(INDEXES)
     return conn
 
 
-def upsert_source(conn: sqlite3.Connection, source: Source) -> None:
-    """Insert or replace a source record."""
+@contextmanager
+def bulk_write(conn: sqlite3.Connection):
+    """Run a block of writes as one IMMEDIATE transaction, rolling back on error.
+
+    Yields a single timestamp; pass it as now= to the writes in the block so
+    their processed_at/created_at values match.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield datetime.now().isoformat()
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def _dumps(value, sort_keys: bool = False) -> str:
+    """Encode a JSON column value (stored as TEXT so SQLite's json1 can read it)."""
+    option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+    return orjson.dumps(value, option=option).decode()
+
+
+_loads = orjson.loads
+
+
+_INSERT_SUB_QUESTION = """INSERT INTO sub_questions
+   (problem_id, question, evidence_needed, disciplines,
+    estimated_complexity, source_id)
+   VALUES (?, ?, ?, ?, ?, ?)"""
+
+_BACKFILL_PROVENANCE = "UPDATE open_problems SET provenance = ? WHERE id = ? AND provenance IS NULL"
+
+_INSERT_RUN_PROBLEM = """INSERT OR IGNORE INTO run_problems (run_id, problem_id)
+   VALUES (?, ?)"""
+
+
+def upsert_source(conn: sqlite3.Connection, source: Source, now: str | None = None) -> None:
+    """Insert or update a source record in place, stamped with now (default: the current time)."""
     conn.execute(
-        """INSERT OR REPLACE INTO sources
+        """INSERT INTO sources
            (id, source_type, title, authors, organization,
             date_published, url, signal_hits, processed_at)
-           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+           ON CONFLICT(id) DO UPDATE SET
+               source_type = excluded.source_type,
+               title = excluded.title,
+               authors = excluded.authors,
+               organization = excluded.organization,
+               date_published = excluded.date_published,
+               url = excluded.url,
+               signal_hits = excluded.signal_hits,
+               processed_at = excluded.processed_at""",
         (
             source.source_id,
             source.source_type,
             source.title,
-            json.dumps(source.authors),
+            _dumps(source.authors),
             source.organization,
             source.date_published,
             source.url,
             len(source.signal_passages),
-            datetime.now().isoformat(),
+            now or datetime.now().isoformat(),
         ),
     )
 
 
+@lru_cache(maxsize=4096)
+def _canonical_json_tuple(items: tuple) -> str:
+    return _dumps(list(items), sort_keys=True)
+
+
 def _canonical_json(value, default):
-    """Serialize list/dict fields deterministically for stable de-duplication."""
-    return json.dumps(value if value is not None else default, sort_keys=True)
+    """Serialize list/dict fields deterministically for stable de-duplication.
+
+    Lists of strings (the common case: source ids, disciplines) are memoized.
+    """
+    if value is None:
+        value = default
+    if isinstance(value, list) and all(isinstance(v, str) for v in value):
+        return _canonical_json_tuple(tuple(value))
+    return _dumps(value, sort_keys=True)
+
+
+# Minimum similarity for a fuzzy passage match to count as provenance
+PROVENANCE_MIN_RATIO = 0.3
+
+
+# Signal passages laid out column-wise: (passages, lowercased contexts, first
+# 200 chars of each context). Built once per source and shared by its problems.
+_Candidates = tuple[list[dict], list[str], list[str]]
+
+
+def _passage_candidates(passages: list[dict]) -> _Candidates:
+    """Lowercase each passage's context once and split out the 200-char heads."""
+    kept, contexts, heads = [], [], []
+    for passage in passages:
+        context = passage.get("context_text", "")
+        if context:
+            context_lower = context.lower()
+            kept.append(passage)
+            contexts.append(context_lower)
+            heads.append(context_lower[:200])
+    return kept, contexts, heads
+
+
+def _best_matching_passage(
+    original_text: str, candidates: _Candidates,
+) -> tuple[dict | None, float]:
+    """Return (passage, similarity in 0..1) for the passage best matching original_text.
+
+    A passage containing the start of original_text wins outright; otherwise the
+    highest fuzzy ratio over the first 200 characters is taken. Matches that
+    cannot reach PROVENANCE_MIN_RATIO are not scored.
+    """
+    passages, contexts, heads = candidates
+
+    # Check if original_text is a substring
+    needle = original_text[:80].lower()
+    for passage, context_lower in zip(passages, contexts):
+        if needle in context_lower:
+            return passage, 1.0
+
+    # Fall back to fuzzy match
+    query = original_text[:200].lower()
+    if fuzz is not None:
+        match = process.extractOne(
+            query, heads, scorer=fuzz.ratio, score_cutoff=PROVENANCE_MIN_RATIO * 100,
+        )
+        if not match:
+            return None, 0.0
+        return passages[match[2]], match[1] / 100.0
+
+    # difflib fallback: index the query once (set_seq2 builds b2j) and swap
+    # passages in as seq1; autojunk would drop common characters in 200-char
+    # heads and skew the ratio
+    matcher = SequenceMatcher(None, autojunk=False)
+    matcher.set_seq2(query)
+    best_passage = None
+    best_ratio = 0.0
+    for passage, head in zip(passages, heads):
+        if head == query:
+            return passage, 1.0
+        # 2*min/(len_a+len_b) bounds the ratio; skip pairs that can't win
+        bound = 2 * min(len(head), len(query)) / (len(head) + len(query))
+        if bound < PROVENANCE_MIN_RATIO or bound <= best_ratio:
+            continue
+        matcher.set_seq1(head)
+        ratio = matcher.ratio()
+        if ratio > best_ratio:
+            best_ratio = ratio
+            best_passage = passage
+    return best_passage, best_ratio
+
+
+def build_provenances(source: Source) -> list[dict | None]:
+    """build_provenance for each of source.problems, normalizing passages once."""
+    candidates = _passage_candidates(source.signal_passages)
+    return [_build_provenance(source, problem, candidates) for problem in source.problems]
 
 
 def build_provenance(source: Source, problem: dict) -> dict | None:
@@ -115,29 +285,20 @@ def build_provenance(source: Source, problem: dict) -> dict | None:
     Returns a dict with section, signal_category, matched_phrases, original_text,
     and a deep_link (text-fragment URL for eLife, section ref for workshops).
     """
+    return _build_provenance(source, problem, _passage_candidates(source.signal_passages))
+
+
+def _build_provenance(
+    source: Source, problem: dict, candidates: _Candidates,
+) -> dict | None:
     original_text = problem.get("original_text", "")
     if not original_text or not source.signal_passages:
         return None
 
     # Find the best-matching signal passage by text similarity
-    best_passage = None
-    best_ratio = 0.0
-    for passage in source.signal_passages:
-        context = passage.get("context_text", "")
-        if not context:
-            continue
-        # Check if original_text is a substring
-        if original_text[:80].lower() in context.lower():
-            best_passage = passage
-            best_ratio = 1.0
-            break
-        # Fall back to fuzzy match
-        ratio = SequenceMatcher(None, original_text[:200].lower(), context[:200].lower()).ratio()
-        if ratio > best_ratio:
-            best_ratio = ratio
-            best_passage = passage
+    best_passage, best_ratio = _best_matching_passage(original_text, candidates)
 
-    if not best_passage or best_ratio < 0.3:
+    if not best_passage or best_ratio < PROVENANCE_MIN_RATIO:
         return {"original_text": original_text}
 
     provenance = {
@@ -172,11 +333,65 @@ def build_provenance(source: Source, problem: dict) -> dict | None:
     return provenance
 
 
+@dataclass
+class PendingWrites:
+    """Row writes queued by upsert_problem/upsert_sub_question for flush_pending.
+
+    sources maps problem_id -> ordered set (dict) of merged source ids.
+    problems (canonical_statement -> (id, source_ids JSON) of the oldest
+    match) and sub_question_keys (existing (problem_id, question) pairs)
+    stand in for the per-row duplicate SELECTs; each is loaded from the
+    database on first use and kept current as rows are added.
+    """
+    sources: dict[int, dict[str, None]] = field(default_factory=dict)
+    provenances: list[tuple[str, int]] = field(default_factory=list)
+    sub_questions: list[tuple] = field(default_factory=list)
+    run_problems: list[tuple[str, int]] = field(default_factory=list)
+    problems: dict[str, tuple[int, str | None]] | None = None
+    sub_question_keys: set[tuple[int, str]] | None = None
+
+
+def _find_problem(
+    conn: sqlite3.Connection, canonical_statement: str, pending: PendingWrites | None,
+) -> tuple[int, str | None] | None:
+    """Return (id, source_ids JSON) of the oldest problem with this statement."""
+    if pending is not None:
+        if pending.problems is None:
+            pending.problems = {}
+            for row in conn.execute(
+                """SELECT id, canonical_statement, source_ids FROM open_problems
+                   WHERE canonical_statement IS NOT NULL
+                   ORDER BY id ASC"""
+            ):
+                pending.problems.setdefault(row["canonical_statement"], (row["id"], row["source_ids"]))
+        return pending.problems.get(canonical_statement)
+
+    # The "<> ''" term lets SQLite use the partial idx_problems_statement_ne.
+    row = conn.execute(
+        """SELECT id, source_ids FROM open_problems
+           WHERE canonical_statement = ?"""
+        + (" AND canonical_statement <> ''" if canonical_statement else "")
+        + """
+           ORDER BY id ASC
+           LIMIT 1""",
+        (canonical_statement,),
+    ).fetchone()
+    return (row["id"], row["source_ids"]) if row else None
+
+
 def upsert_problem(
     conn: sqlite3.Connection, run_id: str, source_id: str, problem: dict,
     provenance: dict | None = None,
+    pending: PendingWrites | None = None,
+    now: str | None = None,
 ) -> int:
-    """Insert/update a problem record and attach it to a run. Returns problem_id."""
+    """Insert/update a problem record and attach it to a run. Returns problem_id.
+
+    A new problem's created_at is now, or the current time if not given.
+    If pending is given, duplicates are looked up in memory and source_ids
+    merges, provenance backfills and the run linkage are queued there instead
+    of being written one row at a time; call flush_pending to apply them.
+    """
     canonical_statement = problem.get("problem_statement", "")
     domain = problem.get("domain", "")
     subdomain = problem.get("subdomain", "")
@@ -185,35 +400,30 @@ def upsert_problem(
     related_keywords = _canonical_json(problem.get("related_keywords"), [])
     original_text = problem.get("original_text", "")
     notes = problem.get("notes", "")
-    provenance_json = json.dumps(provenance) if provenance else None
+    provenance_json = _dumps(provenance) if provenance else None
 
     # Check for existing problem with same statement from same source
-    existing = conn.execute(
-        """SELECT id, source_ids, mention_count FROM open_problems
-           WHERE canonical_statement = ?
-           ORDER BY id ASC
-           LIMIT 1""",
-        (canonical_statement,),
-    ).fetchone()
+    existing = _find_problem(conn, canonical_statement, pending)
 
     if existing:
-        problem_id = existing["id"]
+        problem_id, existing_source_ids = existing
         # Merge source_ids
-        existing_ids = json.loads(existing["source_ids"]) if existing["source_ids"] else []
+        if pending is not None and problem_id in pending.sources:
+            existing_ids = pending.sources[problem_id]
+        else:
+            existing_ids = dict.fromkeys(_loads(existing_source_ids) if existing_source_ids else [])
         if source_id not in existing_ids:
-            existing_ids.append(source_id)
-            conn.execute(
-                """UPDATE open_problems
-                   SET source_ids = ?, mention_count = ?
-                   WHERE id = ?""",
-                (json.dumps(existing_ids, sort_keys=True), len(existing_ids), problem_id),
-            )
+            existing_ids[source_id] = None
+            if pending is not None:
+                pending.sources[problem_id] = existing_ids
+            else:
+                _write_problem_sources(conn, problem_id, existing_ids)
         # Update provenance if not set yet
         if provenance_json:
-            conn.execute(
-                "UPDATE open_problems SET provenance = ? WHERE id = ? AND provenance IS NULL",
-                (provenance_json, problem_id),
-            )
+            if pending is not None:
+                pending.provenances.append((provenance_json, problem_id))
+            else:
+                conn.execute(_BACKFILL_PROVENANCE, (provenance_json, problem_id))
     else:
         cursor = conn.execute(
             """INSERT INTO open_problems
@@ -231,29 +441,72 @@ def upsert_problem(
                 original_text,
                 notes,
                 provenance_json,
-                datetime.now().isoformat(),
+                now or datetime.now().isoformat(),
             ),
         )
         problem_id = cursor.lastrowid
+        if pending is not None and pending.problems is not None and canonical_statement is not None:
+            pending.problems[canonical_statement] = (problem_id, source_ids)
 
     # Ensure run linkage
+    if pending is not None:
+        pending.run_problems.append((run_id, problem_id))
+    else:
+        conn.execute(_INSERT_RUN_PROBLEM, (run_id, problem_id))
+
+    return problem_id
+
+
+def _write_problem_sources(
+    conn: sqlite3.Connection, problem_id: int, source_ids: dict[str, None]
+) -> None:
     conn.execute(
-        """INSERT OR IGNORE INTO run_problems (run_id, problem_id)
-           VALUES (?, ?)""",
-        (run_id, problem_id),
+        """UPDATE open_problems
+           SET source_ids = ?, mention_count = ?
+           WHERE id = ?""",
+        (_dumps(list(source_ids)), len(source_ids), problem_id),
     )
 
-    return problem_id
+
+def flush_pending(conn: sqlite3.Connection, pending: PendingWrites) -> None:
+    """Apply queued writes: one UPDATE per merged problem, then batched statements."""
+    for problem_id, source_ids in pending.sources.items():
+        _write_problem_sources(conn, problem_id, source_ids)
+    conn.executemany(_BACKFILL_PROVENANCE, pending.provenances)
+    conn.executemany(_INSERT_SUB_QUESTION, pending.sub_questions)
+    conn.executemany(_INSERT_RUN_PROBLEM, pending.run_problems)
+    pending.sources.clear()
+    pending.provenances.clear()
+    pending.sub_questions.clear()
+    pending.run_problems.clear()
 
 
 def upsert_sub_question(
-    conn: sqlite3.Connection, problem_id: int, sq: dict, source_id: str
+    conn: sqlite3.Connection, problem_id: int, sq: dict, source_id: str,
+    pending: PendingWrites | None = None,
 ) -> None:
-    """Insert a sub-question for a problem."""
+    """Insert a sub-question for a problem (queued on pending, if given)."""
     question = sq.get("question", "")
-    evidence_needed = sq.get("evidence_needed", "")
-    disciplines = _canonical_json(sq.get("disciplines"), [])
-    estimated_complexity = sq.get("estimated_complexity", "")
+    row = (
+        problem_id,
+        question,
+        sq.get("evidence_needed", ""),
+        _canonical_json(sq.get("disciplines"), []),
+        sq.get("estimated_complexity", ""),
+        source_id,
+    )
+
+    if pending is not None:
+        if pending.sub_question_keys is None:
+            pending.sub_question_keys = {
+                (r[0], r[1])
+                for r in conn.execute("SELECT problem_id, question FROM sub_questions")
+            }
+        key = (problem_id, question)
+        if key not in pending.sub_question_keys:
+            pending.sub_question_keys.add(key)
+            pending.sub_questions.append(row)
+        return
 
     # Check for existing identical sub-question
     existing = conn.execute(
@@ -264,24 +517,11 @@ def upsert_sub_question(
     ).fetchone()
 
     if not existing:
-        conn.execute(
-            """INSERT INTO sub_questions
-               (problem_id, question, evidence_needed, disciplines,
-                estimated_complexity, source_id)
-               VALUES (?, ?, ?, ?, ?, ?)""",
-            (
-                problem_id,
-                question,
-                evidence_needed,
-                disciplines,
-                estimated_complexity,
-                source_id,
-            ),
-        )
+        conn.execute(_INSERT_SUB_QUESTION, row)
 
 
-def record_pipeline_run(conn: sqlite3.Connection, run_info: dict) -> int:
-    """Record a pipeline run and return the row id."""
+def record_pipeline_run(conn: sqlite3.Connection, run_info: dict, now: str | None = None) -> int:
+    """Record a pipeline run (timestamped now, by default the current time) and return the row id."""
     cursor = conn.execute(
         """INSERT INTO pipeline_runs
            (run_id, run_date, source_types, sources_ingested, signal_passages,
@@ -289,68 +529,79 @@ def record_pipeline_run(conn: sqlite3.Connection, run_info: dict) -> int:
            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
         (
             run_info.get("run_id", ""),
-            datetime.now().isoformat(),
-            json.dumps(run_info.get("source_types", ["workshop_report"])),
+            now or datetime.now().isoformat(),
+            _dumps(run_info.get("source_types", ["workshop_report"])),
             run_info.get("sources_ingested", 0),
             run_info.get("signal_passages", 0),
             run_info.get("problems_extracted", 0),
             run_info.get("sub_questions_extracted", 0),
             run_info.get("total_cost", 0.0),
-            json.dumps(run_info.get("config", {})),
+            _dumps(run_info.get("config", {})),
         ),
     )
     return cursor.lastrowid
 
 
-def export_json_feed(
-    conn: sqlite3.Connection,
-    run_id: str,
-    output_path: Path | None = None,
-) -> Path:
-    """Export problems as a JSON feed file."""
-    output_path = output_path or RESULTS_DIR / "problems_feed.json"
+def _prefetch_details(
+    conn: sqlite3.Connection, problem_rows: list[sqlite3.Row],
+) -> tuple[dict[int, list], dict[str, sqlite3.Row], dict[int, list[sqlite3.Row]]]:
+    """Load the sources and sub-questions for a set of problems in two queries.
 
-    # Get run stats
-    run_row = conn.execute(
-        """SELECT * FROM pipeline_runs WHERE run_id = ? ORDER BY id DESC LIMIT 1""",
-        (run_id,),
-    ).fetchone()
+    Returns (source ids per problem id, source rows by id, sub-question rows
+    per problem id in id order).
+    """
+    source_ids_by_problem = {
+        prob["id"]: _loads(prob["source_ids"]) if prob["source_ids"] else []
+        for prob in problem_rows
+    }
+    all_source_ids = {sid for ids in source_ids_by_problem.values() for sid in ids}
+    sources_by_id = {
+        row["id"]: row
+        for row in conn.execute(
+            """SELECT id, source_type, title, url FROM sources
+               WHERE id IN (SELECT value FROM json_each(?))""",
+            (_dumps(sorted(all_source_ids)),),
+        )
+    }
 
-    # Get problems for this run
-    problem_rows = conn.execute(
-        """SELECT op.* FROM run_problems rp
-           JOIN open_problems op ON op.id = rp.problem_id
-           WHERE rp.run_id = ?
-           ORDER BY op.mention_count DESC, op.id ASC""",
-        (run_id,),
-    ).fetchall()
+    sq_rows_by_problem = defaultdict(list)
+    for sq in conn.execute(
+        """SELECT * FROM sub_questions
+           WHERE problem_id IN (SELECT value FROM json_each(?))
+           ORDER BY id""",
+        (_dumps(list(source_ids_by_problem)),),
+    ):
+        sq_rows_by_problem[sq["problem_id"]].append(sq)
 
-    feed = {
-        "generated_at": datetime.now().isoformat(),
-        "pipeline_run_id": run_id,
-        "summary": {
-            "sources_scanned": run_row["sources_ingested"] if run_row else 0,
-            "signal_passages": run_row["signal_passages"] if run_row else 0,
-            "problems_extracted": run_row["problems_extracted"] if run_row else 0,
-            "sub_questions": run_row["sub_questions_extracted"] if run_row else 0,
-        },
-        "problems": [],
-    }
+    return source_ids_by_problem, sources_by_id, sq_rows_by_problem
 
+
+def _feed_entries(conn: sqlite3.Connection, problem_rows):
+    """Yield one feed entry per problem row, in order.
+
+    problem_rows may be a cursor; it is read EXPORT_CHUNK_SIZE rows at a
+    time, so only one chunk's problems, sources and sub-questions are in
+    memory at once.
+    """
+    rows = iter(problem_rows)
+    while chunk := list(islice(rows, EXPORT_CHUNK_SIZE)):
+        yield from _chunk_entries(chunk, *_prefetch_details(conn, chunk))
+
+
+def _chunk_entries(
+    problem_rows: list[sqlite3.Row],
+    source_ids_by_problem: dict[int, list],
+    sources_by_id: dict[str, sqlite3.Row],
+    sq_rows_by_problem: dict[int, list[sqlite3.Row]],
+):
+    """Yield the feed entries for one chunk of problem rows and its prefetched details."""
     for prob in problem_rows:
-        # Get sub-questions for this problem
-        sq_rows = conn.execute(
-            """SELECT * FROM sub_questions WHERE problem_id = ? ORDER BY id""",
-            (prob["id"],),
-        ).fetchall()
+        sq_rows = sq_rows_by_problem.get(prob["id"], [])
 
         # Get source details
-        source_ids = json.loads(prob["source_ids"]) if prob["source_ids"] else []
         sources_detail = []
-        for sid in source_ids:
-            src = conn.execute(
-                "SELECT id, source_type, title, url FROM sources WHERE id = ?", (sid,)
-            ).fetchone()
+        for sid in source_ids_by_problem[prob["id"]]:
+            src = sources_by_id.get(sid)
             if src:
                 detail = {
                     "id": src["id"],
@@ -372,103 +623,108 @@ def export_json_feed(
                 {
                     "question": sq["question"],
                     "evidence_needed": sq["evidence_needed"],
-                    "disciplines": json.loads(sq["disciplines"]) if sq["disciplines"] else [],
+                    "disciplines": _loads(sq["disciplines"]) if sq["disciplines"] else [],
                     "estimated_complexity": sq["estimated_complexity"],
                 }
                 for sq in sq_rows
             ],
-            "related_keywords": json.loads(prob["related_keywords"]) if prob["related_keywords"] else [],
+            "related_keywords": _loads(prob["related_keywords"]) if prob["related_keywords"] else [],
         }
         if prob["provenance"]:
-            entry["provenance"] = json.loads(prob["provenance"])
-        feed["problems"].append(entry)
+            entry["provenance"] = _loads(prob["provenance"])
+        yield entry
 
-    with open(output_path, "w") as f:
-        json.dump(feed, f, indent=2)
-
-    return output_path
 
+def _write_feed(output_path: Path, feed: dict, entries) -> None:
+    """Write feed plus a trailing "problems" list, serializing one entry at a time.
 
-def export_all_json_feed(
+    Produces the same layout as json.dump(..., indent=2) without ever holding
+    the whole feed in memory.
+    """
+    head = orjson.dumps({**feed, "problems": []}, option=orjson.OPT_INDENT_2)
+    with open(output_path, "wb") as f:
+        f.write(head[:-len(b"]\n}")])  # keep the opening "["
+        sep = b"\n    "
+        for entry in entries:
+            f.write(sep)
+            f.write(orjson.dumps(entry, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n    "))
+            sep = b",\n    "
+        f.write(b"]\n}" if sep == b"\n    " else b"\n  ]\n}")
+
+
+def _export(
     conn: sqlite3.Connection,
-    output_path: Path | None = None,
+    output_path: Path,
+    run_id: str,
+    problems_sql: str,
+    stats_sql: str,
+    params: tuple = (),
 ) -> Path:
-    """Export ALL problems from the database as a JSON feed file."""
-    output_path = output_path or RESULTS_DIR / "problems_feed.json"
+    """Write a feed of the problems selected by problems_sql.
 
-    # Aggregate stats across all runs
-    stats = conn.execute(
-        """SELECT
-            SUM(sources_ingested) as sources,
-            SUM(signal_passages) as signals,
-            SUM(problems_extracted) as problems,
-            SUM(sub_questions_extracted) as sub_q
-           FROM pipeline_runs"""
-    ).fetchone()
-
-    # Get all problems
-    problem_rows = conn.execute(
-        """SELECT * FROM open_problems
-           ORDER BY mention_count DESC, id ASC"""
-    ).fetchall()
+    stats_sql must return one row with sources, signals, problems and sub_q
+    columns; both queries are run with params.
+    """
+    stats = conn.execute(stats_sql, params).fetchone()
 
     feed = {
         "generated_at": datetime.now().isoformat(),
-        "pipeline_run_id": "all",
+        "pipeline_run_id": run_id,
         "summary": {
             "sources_scanned": stats["sources"] if stats else 0,
             "signal_passages": stats["signals"] if stats else 0,
-            "problems_extracted": len(problem_rows),
+            "problems_extracted": stats["problems"] if stats else 0,
             "sub_questions": stats["sub_q"] if stats else 0,
         },
-        "problems": [],
     }
 
-    for prob in problem_rows:
-        sq_rows = conn.execute(
-            """SELECT * FROM sub_questions WHERE problem_id = ? ORDER BY id""",
-            (prob["id"],),
-        ).fetchall()
+    # Problem rows stream from the cursor as the feed is written
+    _write_feed(output_path, feed, _feed_entries(conn, conn.execute(problems_sql, params)))
 
-        source_ids = json.loads(prob["source_ids"]) if prob["source_ids"] else []
-        sources_detail = []
-        for sid in source_ids:
-            src = conn.execute(
-                "SELECT id, source_type, title, url FROM sources WHERE id = ?", (sid,)
-            ).fetchone()
-            if src:
-                detail = {
-                    "id": src["id"],
-                    "type": src["source_type"],
-                    "title": src["title"],
-                }
-                if src["url"]:
-                    detail["url"] = src["url"]
-                sources_detail.append(detail)
+    return output_path
 
-        entry = {
-            "problem_statement": prob["canonical_statement"],
-            "domain": prob["domain"],
-            "subdomain": prob["subdomain"],
-            "scope": prob["scope"],
-            "mention_count": prob["mention_count"],
-            "sources": sources_detail,
-            "sub_questions": [
-                {
-                    "question": sq["question"],
-                    "evidence_needed": sq["evidence_needed"],
-                    "disciplines": json.loads(sq["disciplines"]) if sq["disciplines"] else [],
-                    "estimated_complexity": sq["estimated_complexity"],
-                }
-                for sq in sq_rows
-            ],
-            "related_keywords": json.loads(prob["related_keywords"]) if prob["related_keywords"] else [],
-        }
-        if prob["provenance"]:
-            entry["provenance"] = json.loads(prob["provenance"])
-        feed["problems"].append(entry)
 
-    with open(output_path, "w") as f:
-        json.dump(feed, f, indent=2)
+def export_json_feed(
+    conn: sqlite3.Connection,
+    run_id: str,
+    output_path: Path | None = None,
+) -> Path:
+    """Export problems as a JSON feed file."""
+    return _export(
+        conn,
+        output_path or RESULTS_DIR / "problems_feed.json",
+        run_id,
+        """SELECT op.* FROM run_problems rp
+           JOIN open_problems op ON op.id = rp.problem_id
+           WHERE rp.run_id = ?
+           ORDER BY op.mention_count DESC, op.id ASC""",
+        # Stats for the latest record of this run
+        """SELECT
+            sources_ingested as sources,
+            signal_passages as signals,
+            problems_extracted as problems,
+            sub_questions_extracted as sub_q
+           FROM pipeline_runs WHERE run_id = ? ORDER BY id DESC LIMIT 1""",
+        (run_id,),
+    )
+
 
-    return output_path
+def export_all_json_feed(
+    conn: sqlite3.Connection,
+    output_path: Path | None = None,
+) -> Path:
+    """Export ALL problems from the database as a JSON feed file."""
+    return _export(
+        conn,
+        output_path or RESULTS_DIR / "problems_feed.json",
+        "all",
+        """SELECT * FROM open_problems
+           ORDER BY mention_count DESC, id ASC""",
+        # Aggregate stats across all runs
+        """SELECT
+            SUM(sources_ingested) as sources,
+            SUM(signal_passages) as signals,
+            (SELECT COUNT(*) FROM open_problems) as problems,
+            SUM(sub_questions_extracted) as sub_q
+           FROM pipeline_runs""",
+    )
@@ -1,11 +1,16 @@
 """Shared PDF text extraction and section detection utilities."""
 
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 logger = logging.getLogger("collector.pdf_utils")
 
+# Below this many PDFs, extracting in-process is faster than starting workers
+PARALLEL_MIN_PDFS = 4
+
 # Section header patterns for report detection
 SECTION_PATTERNS = [
     (r"(?:^|\n)\s*(?:\d+\.?\s*)?executive\s+summary\s*\n", "executive_summary"),
@@ -25,41 +30,109 @@ SECTION_PATTERNS = [
 ]
 
 
-def extract_text_from_pdf(pdf_path: Path) -> str | None:
-    """Extract text from a PDF using pymupdf."""
+def list_pdfs(directory: Path) -> list[Path]:
+    """Return the PDF files directly inside directory, sorted by path."""
+    with os.scandir(directory) as it:
+        return sorted(
+            Path(entry.path) for entry in it
+            if entry.name.endswith(".pdf") and entry.is_file()
+        )
+
+
+def map_pdfs(ingest_one, pdf_files: list[Path], metadata: list[dict]) -> list:
+    """Return ingest_one(pdf_path, metadata) for each PDF, in order.
+
+    PDF text extraction is CPU-bound, so runs of PARALLEL_MIN_PDFS or more are
+    spread across worker processes; smaller ones stay in this process.
+    """
+    workers = min(len(pdf_files), os.cpu_count() or 1)
+    if workers == 1 or len(pdf_files) < PARALLEL_MIN_PDFS:
+        return list(map(ingest_one, pdf_files, metadata))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(ingest_one, pdf_files, metadata))
+
+
+def extract_text_and_sections(pdf_path: Path) -> tuple[str | None, dict]:
+    """Extract text and detect sections in a single pass over the PDF's pages.
+
+    Gives the same sections as running detect_sections on the full text,
+    except that headings are matched page by page as the text is collected.
+    Returns (None, {}) if no text could be extracted.
+    """
     try:
         import pymupdf
-        doc = pymupdf.open(str(pdf_path))
-        text = ""
-        for page in doc:
-            text += page.get_text()
-        doc.close()
-        return text if text.strip() else None
+        pages = []
+        boundaries = []
+        offset = 0
+        with pymupdf.open(str(pdf_path)) as doc:
+            for page in doc:
+                page_text = page.get_text()
+                boundaries.extend(_find_section_boundaries(page_text, offset))
+                pages.append(page_text)
+                offset += len(page_text)
     except Exception as e:
         logger.warning("PDF text extraction failed for %s: %s", pdf_path, e)
-        return None
+        return None, {}
 
+    text = "".join(pages)
+    if not text.strip():
+        return None, {}
+    return text, _sections_from_boundaries(text, boundaries)
+
+
+def _heading_core(pattern: str) -> str:
+    """Strip a SECTION_PATTERNS entry down to its heading text."""
+    return pattern.removeprefix(r"(?:^|\n)\s*").removesuffix(r"\s*\n")
 
-def detect_sections(text: str) -> dict:
-    """Detect report sections via regex heuristics."""
-    sections = {}
-    boundaries = []
-    text_lower = text.lower()
 
-    for pattern, name in SECTION_PATTERNS:
-        for match in re.finditer(pattern, text_lower):
-            boundaries.append((match.start(), match.end(), name))
+# All SECTION_PATTERNS fused into one alternation, so text is scanned once.
+# The line-start and trailing-newline anchors become lookarounds: a heading
+# match doesn't consume the newline the next heading's anchor needs.
+_SECTION_RE = re.compile(
+    r"(?<![^\n])\s*(?:"
+    + "|".join(f"(?P<g{i}>{_heading_core(p)})" for i, (p, _) in enumerate(SECTION_PATTERNS))
+    + r")(?=\s*\n)",
+    re.IGNORECASE,
+)
+_SECTION_GROUP_NAMES = {f"g{i}": name for i, (_, name) in enumerate(SECTION_PATTERNS)}
 
-    boundaries.sort(key=lambda x: x[0])
 
+def _find_section_boundaries(text: str, offset: int = 0) -> list[tuple[int, int, str]]:
+    """Return (start, end, name) heading matches in text order, shifted by offset."""
+    return [
+        (m.start() + offset, m.end() + offset, _SECTION_GROUP_NAMES[m.lastgroup])
+        for m in _SECTION_RE.finditer(text)
+    ]
+
+
+_NON_SPACE_RE = re.compile(r"\S")
+
+
+def _strip_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """Return the bounds of text[start:end].strip() without copying the slice."""
+    m = _NON_SPACE_RE.search(text, start, end)
+    if not m:
+        return start, start
+    while text[end - 1].isspace():
+        end -= 1
+    return m.start(), end
+
+
+def _sections_from_boundaries(text: str, boundaries: list[tuple[int, int, str]]) -> dict:
+    """Slice text into sections between sorted heading boundaries."""
+    # Resolve each section to its final (start, end) first, so a heading that
+    # repeats only costs one string copy
+    spans = {}
     for i, (start, end, name) in enumerate(boundaries):
         # Skip appendix, acknowledgements, and references content
         if name in ("appendix", "acknowledgements", "references"):
             continue
-        if i + 1 < len(boundaries):
-            next_start = boundaries[i + 1][0]
-            sections[name] = text[end:next_start].strip()
-        else:
-            sections[name] = text[end:].strip()
+        next_start = boundaries[i + 1][0] if i + 1 < len(boundaries) else len(text)
+        spans[name] = _strip_span(text, end, next_start)
+
+    return {name: text[start:end] for name, (start, end) in spans.items()}
+
 
-    return sections
+def detect_sections(text: str) -> dict:
+    """Detect report sections via regex heuristics."""
+    return _sections_from_boundaries(text, _find_section_boundaries(text))
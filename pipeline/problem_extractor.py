@@ -1,20 +1,32 @@
 """Stage 3: Open problem extraction and decomposition using Claude Sonnet."""
 
 import asyncio
+import hashlib
 import json
 import logging
 import re
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
 
 import anthropic
+import orjson
 
 from pipeline import (
     Source, load_config, CHECKPOINTS_DIR, RESULTS_DIR,
-    write_incremental_checkpoint, load_incremental_checkpoint,
+    write_incremental_checkpoint, load_incremental_sources,
     CostTracker, BudgetExceeded,
 )
 
 logger = logging.getLogger("collector.problem_extractor")
 
+# Sources per incremental checkpoint write
+CHECKPOINT_BATCH_SIZE = 10
+
+# Exact-match Stage 3 response cache: file location and entry cap
+RESPONSE_CACHE_PATH = CHECKPOINTS_DIR / "stage3_response_cache.jsonl"
+RESPONSE_CACHE_MAX_ENTRIES = 50_000
+
 # Approximate tokens = chars / 4
 MAX_INPUT_CHARS = 8000 * 4  # ~8K tokens
 
@@ -148,13 +160,54 @@ Signal passages:
 """
 
 
+def _split_prompt(template: str) -> tuple[str, str, str]:
+    """Split a template into its static instructions and the per-source tail.
+
+    The tail is the final paragraph ("Source document: {source_title}..."),
+    the only part that varies between calls; it is returned as the text
+    before and after the title, so rendering is plain concatenation.
+    """
+    instructions, _, tail = template.rpartition("\n\n")
+    before_title, _, after_title = tail.partition("{source_title}")
+    return instructions + "\n\n", before_title, after_title
+
+
+_PROMPT_PARTS = {
+    "elife_review": _split_prompt(REVIEW_EXTRACTION_PROMPT),
+    "": _split_prompt(EXTRACTION_PROMPT),
+}
+
+
+def _prompt_parts(source_type: str) -> tuple[str, str, str]:
+    return _PROMPT_PARTS["elife_review" if source_type == "elife_review" else ""]
+
+
 def _build_extraction_prompt(source_title: str, passages_text: str, source_type: str = "") -> str:
     """Render extraction prompt without treating JSON braces as format tokens."""
-    if source_type == "elife_review":
-        template = REVIEW_EXTRACTION_PROMPT
-    else:
-        template = EXTRACTION_PROMPT
-    return template.replace("{source_title}", source_title) + passages_text
+    instructions, before_title, after_title = _prompt_parts(source_type)
+    return instructions + before_title + source_title + after_title + passages_text
+
+
+def _build_extraction_content(source_title: str, passages_text: str,
+                              source_type: str = "") -> list[dict]:
+    """The extraction prompt as content blocks, with the static instructions
+    marked for prompt caching so repeated calls can reuse them."""
+    instructions, before_title, after_title = _prompt_parts(source_type)
+    return [
+        {"type": "text", "text": instructions, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": before_title + source_title + after_title + passages_text},
+    ]
+
+
+# Markdown code fences around a JSON response
+_OPEN_FENCE_RE = re.compile(r"^```(?:json)?\s*\n?")
+_CLOSE_FENCE_RE = re.compile(r"\n?```\s*$")
+
+# A complete problem object in a truncated response: complete ones end with a
+# closing brace on its own line, before a comma or the end of the array
+_SALVAGE_PROBLEM_RE = re.compile(r'\{\s*"problem_statement".*?\n\s*\}', re.DOTALL)
+
+_JSON_DECODER = json.JSONDecoder()
 
 
 def _parse_json_response(text: str, truncated: bool = False) -> dict | None:
@@ -165,20 +218,22 @@ def _parse_json_response(text: str, truncated: bool = False) -> dict | None:
     """
     text = text.strip()
     if text.startswith("```"):
-        text = re.sub(r"^```(?:json)?\s*\n?", "", text)
-        text = re.sub(r"\n?```\s*$", "", text)
+        text = _OPEN_FENCE_RE.sub("", text, count=1)
+        text = _CLOSE_FENCE_RE.sub("", text, count=1)
 
     text = text.strip()
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         pass
 
-    # Try extracting outermost JSON object
-    match = re.search(r"\{.*\}", text, re.DOTALL)
-    if match:
+    # Try decoding the JSON object that starts at the first brace, ignoring
+    # any prose around it (one linear pass, unlike a DOTALL regex search)
+    start = text.find("{")
+    if start != -1:
         try:
-            return json.loads(match.group())
+            obj, _ = _JSON_DECODER.raw_decode(text, start)
+            return obj
         except json.JSONDecodeError:
             pass
 
@@ -188,17 +243,11 @@ def _parse_json_response(text: str, truncated: bool = False) -> dict | None:
     # Truncated response — salvage complete problem objects from partial JSON
     # Find all complete {...} blocks within the "problems" array
     problems = []
-    # Look for individual problem objects (complete ones end with a closing brace
-    # followed by a comma or the end of the array)
-    pattern = re.compile(
-        r'\{\s*"problem_statement".*?\n\s*\}',
-        re.DOTALL,
-    )
-    for m in pattern.finditer(text):
+    for m in _SALVAGE_PROBLEM_RE.finditer(text):
         try:
-            obj = json.loads(m.group())
+            obj = orjson.loads(m.group())
             problems.append(obj)
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             continue
 
     if problems:
@@ -218,19 +267,143 @@ def _parse_json_response(text: str, truncated: bool = False) -> dict | None:
 def _build_extraction_input(source: Source) -> str:
     """Build the text input for extraction from a source's signal passages."""
     parts = []
+    size = 0
     for i, passage in enumerate(source.signal_passages, 1):
         section = passage.get("section", "unknown")
         category = passage.get("signal_category", "?")
         text = passage.get("context_text", "")
-        parts.append(f"[Passage {i}] (section: {section}, signal: {category})\n{text}")
+        part = f"[Passage {i}] (section: {section}, signal: {category})\n{text}"
+        size += len(part) + (2 if parts else 0)
+
+        # Hard cap at ~8K tokens: keep whole passages, and cut the one that
+        # crosses the cap at a word boundary rather than mid-word
+        if size > MAX_INPUT_CHARS:
+            room = len(part) - (size - MAX_INPUT_CHARS)
+            if room > 0:
+                cut = part.rfind(" ", 0, room + 1)
+                parts.append(part[:cut if cut > 0 else room].rstrip())
+            return "\n\n".join(parts) + "\n[TRUNCATED]"
+        parts.append(part)
+
+    return "\n\n".join(parts)
+
+
+def _build_request_params(source: Source, model: str) -> dict:
+    """Messages API parameters for extracting problems from one source."""
+    passages_text = _build_extraction_input(source)
+    content = _build_extraction_content(source.title, passages_text, source.source_type)
+    return {
+        "model": model,
+        "max_tokens": 8000,
+        "messages": [{"role": "user", "content": content}],
+    }
+
+
+def _record_usage(cost_tracker: CostTracker | None, model: str, usage,
+                  batch: bool = False) -> None:
+    """Bill one response's token usage, including prompt-cache reads and writes."""
+    if cost_tracker:
+        cost_tracker.record(
+            model,
+            usage.input_tokens,
+            usage.output_tokens,
+            stage="stage3",
+            batch=batch,
+            cache_write_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+            cache_read_tokens=getattr(usage, "cache_read_input_tokens", None) or 0,
+        )
 
-    combined = "\n\n".join(parts)
 
-    # Hard cap at ~8K tokens
-    if len(combined) > MAX_INPUT_CHARS:
-        combined = combined[:MAX_INPUT_CHARS] + "\n[TRUNCATED]"
+def _apply_response(source: Source, response) -> bool:
+    """Parse an extraction response (a Message) into source.problems.
+
+    Returns True if the response parsed; on failure source.problems is [].
+    """
+    if not response.content:
+        logger.warning("Empty response for %s, skipping", source.source_id)
+        source.problems = []
+        return False
+    text = response.content[0].text
+    truncated = response.stop_reason == "max_tokens"
+    if truncated:
+        logger.warning("Response truncated for %s (%d chars), attempting salvage",
+                       source.source_id, len(text))
+    parsed = _parse_json_response(text, truncated=truncated)
+
+    if parsed:
+        source.problems = parsed.get("problems", [])
+        meta = parsed.get("meta", {})
+        logger.debug(
+            "Extracted %d problems from %s (decomposable: %d)",
+            meta.get("total_problems_found", len(source.problems)),
+            source.source_id,
+            meta.get("decomposable_count", 0),
+        )
+        return True
+
+    logger.warning("Failed to parse extraction JSON for %s", source.source_id)
+    source.problems = []
+    return False
+
+
+class _ResponseCache:
+    """Exact-match cache of parsed extraction results, keyed on the request.
+
+    The key is a SHA-256 of the full request params (model, prompt, passages),
+    so a source is only served from cache when Sonnet would be sent exactly
+    the same request again. Entries are appended to a JSONL file; on load only
+    the newest max_entries are kept and the file is compacted to match.
+    """
 
-    return combined
+    def __init__(self, path: Path, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.entries: OrderedDict[str, list[dict]] = OrderedDict()
+        self._load()
+
+    @staticmethod
+    def key(params: dict) -> str:
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        lines = 0
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    d = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue
+                lines += 1
+                self.entries.pop(d["key"], None)
+                self.entries[d["key"]] = d["problems"]
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        if lines > len(self.entries):
+            with open(self.path, "w", encoding="utf-8") as f:
+                for key, problems in self.entries.items():
+                    f.write(json.dumps({"key": key, "problems": problems}) + "\n")
+
+    def get(self, params: dict) -> list[dict] | None:
+        """Return a copy of the cached problems for params, or None."""
+        problems = self.entries.get(self.key(params))
+        if problems is None:
+            return None
+        return orjson.loads(orjson.dumps(problems))
+
+    def put(self, params: dict, problems: list[dict]) -> None:
+        key = self.key(params)
+        self.entries.pop(key, None)
+        self.entries[key] = problems
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"key": key, "problems": problems}) + "\n")
 
 
 async def _extract_one(
@@ -240,52 +413,18 @@ async def _extract_one(
     semaphore: asyncio.Semaphore,
     cost_tracker: CostTracker | None = None,
     retry_attempts: int = 3,
+    cache: _ResponseCache | None = None,
 ) -> Source:
     """Extract open problems from a single source document."""
     async with semaphore:
-        passages_text = _build_extraction_input(source)
-        prompt = _build_extraction_prompt(source.title, passages_text, source.source_type)
+        params = _build_request_params(source, model)
 
         for attempt in range(retry_attempts):
             try:
-                response = await client.messages.create(
-                    model=model,
-                    max_tokens=8000,
-                    messages=[{"role": "user", "content": prompt}],
-                )
-
-                if cost_tracker:
-                    cost_tracker.record(
-                        model,
-                        response.usage.input_tokens,
-                        response.usage.output_tokens,
-                        stage="stage3",
-                    )
-
-                if not response.content:
-                    logger.warning("Empty response for %s, skipping", source.source_id)
-                    source.problems = []
-                    return source
-                text = response.content[0].text
-                truncated = response.stop_reason == "max_tokens"
-                if truncated:
-                    logger.warning("Response truncated for %s (%d chars), attempting salvage",
-                                   source.source_id, len(text))
-                parsed = _parse_json_response(text, truncated=truncated)
-
-                if parsed:
-                    source.problems = parsed.get("problems", [])
-                    meta = parsed.get("meta", {})
-                    logger.debug(
-                        "Extracted %d problems from %s (decomposable: %d)",
-                        meta.get("total_problems_found", len(source.problems)),
-                        source.source_id,
-                        meta.get("decomposable_count", 0),
-                    )
-                else:
-                    logger.warning("Failed to parse extraction JSON for %s", source.source_id)
-                    source.problems = []
-
+                response = await client.messages.create(**params)
+                _record_usage(cost_tracker, model, response.usage)
+                if _apply_response(source, response) and cache is not None:
+                    cache.put(params, source.problems)
                 return source
 
             except BudgetExceeded:
@@ -306,29 +445,205 @@ async def _extract_one(
         return source
 
 
-def _get_already_extracted_ids() -> set[str]:
-    """Return source_ids that already have problems in the DB."""
-    import sqlite3
+async def _extract_individually(
+    client: anthropic.AsyncAnthropic,
+    sources: list[Source],
+    run_id: str,
+    model: str,
+    max_concurrent: int,
+    cost_tracker: CostTracker | None = None,
+    retry_attempts: int = 3,
+    cache: _ResponseCache | None = None,
+) -> list[Source]:
+    """Extract with one concurrent Messages API call per source.
+
+    Each result is checkpointed as soon as it arrives, so an interrupted run
+    keeps everything that finished. Sources are scheduled in windows of
+    several times max_concurrent, with the cost logged after each window.
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def extract_and_checkpoint(source: Source) -> Source:
+        result = await _extract_one(
+            client, source, model, semaphore, cost_tracker, retry_attempts, cache,
+        )
+        write_incremental_checkpoint(run_id, "stage3", [result])
+        return result
+
+    window = max(CHECKPOINT_BATCH_SIZE, max_concurrent * 4)
+    extracted = []
+
+    for i in range(0, len(sources), window):
+        batch = sources[i:i + window]
+        logger.info("Extracting batch %d-%d of %d",
+                     i + 1, min(i + window, len(sources)), len(sources))
+
+        extracted.extend(await asyncio.gather(*map(extract_and_checkpoint, batch)))
+
+        if cost_tracker:
+            cost_tracker.log_status()
+
+    return extracted
+
+
+async def _extract_with_batch_api(
+    client: anthropic.AsyncAnthropic,
+    sources: list[Source],
+    run_id: str,
+    model: str,
+    cost_tracker: CostTracker | None = None,
+    poll_interval: float = 30.0,
+    max_poll_interval: float = 600.0,
+    cache: _ResponseCache | None = None,
+) -> tuple[list[Source], list[Source]]:
+    """Extract via one Message Batches API job, at the batch discount.
+
+    Only as many sources are submitted as the remaining budget covers at
+    their worst-case cost; the rest are left unextracted. Polls with
+    exponential backoff until the batch has ended, then streams the results,
+    checkpointing as they arrive. Returns (extracted, failed); failed sources
+    (errored/expired/canceled requests) have not been checkpointed and are
+    left for a retry. If spend passes the budget, every (already billed)
+    result is still applied and checkpointed before BudgetExceeded is raised.
+    """
+    # custom_id is limited to [a-zA-Z0-9_-]{1,64}, which source ids don't guarantee
+    by_custom_id = {}
+    params_by_id = {}
+    budget = cost_tracker.remaining if cost_tracker else None
+    for i, source in enumerate(sources):
+        params = _build_request_params(source, model)
+        if budget is not None:
+            budget -= _worst_case_cost(params)
+            if budget < 0:
+                logger.warning("Budget guard: submitting %d of %d batch requests; "
+                                "the rest could exceed the remaining budget", i, len(sources))
+                break
+        by_custom_id[f"source-{i}"] = source
+        params_by_id[f"source-{i}"] = params
+    if not by_custom_id:
+        return [], []
+
+    batch = await client.messages.batches.create(requests=[
+        {"custom_id": custom_id, "params": params}
+        for custom_id, params in params_by_id.items()
+    ])
+    logger.info("Submitted message batch %s (%d requests)", batch.id, len(by_custom_id))
+
+    delay = poll_interval
+    while batch.processing_status != "ended":
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_poll_interval)
+        batch = await client.messages.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        logger.info("Message batch %s: %d processing, %d succeeded, %d errored",
+                     batch.id, counts.processing, counts.succeeded, counts.errored)
+
+    extracted, failed, pending = [], [], []
+    # Every result is billed by now, so going over budget mustn't stop the
+    # rest from being applied and checkpointed; it's raised after the loop
+    budget_exceeded = None
+    try:
+        async for entry in await client.messages.batches.results(batch.id):
+            source = by_custom_id[entry.custom_id]
+            if entry.result.type != "succeeded":
+                logger.warning("Batch request for %s %s", source.source_id, entry.result.type)
+                failed.append(source)
+                continue
+
+            message = entry.result.message
+            try:
+                _record_usage(cost_tracker, model, message.usage, batch=True)
+            except BudgetExceeded as e:
+                budget_exceeded = budget_exceeded or e
+            if _apply_response(source, message) and cache is not None:
+                cache.put(params_by_id[entry.custom_id], source.problems)
+            extracted.append(source)
+            pending.append(source)
+            if len(pending) >= CHECKPOINT_BATCH_SIZE:
+                write_incremental_checkpoint(run_id, "stage3", pending)
+                pending = []
+    finally:
+        if pending:
+            write_incremental_checkpoint(run_id, "stage3", pending)
+
+    if cost_tracker:
+        cost_tracker.log_status()
+    if budget_exceeded:
+        raise budget_exceeded
+    return extracted, failed
+
+
+def _worst_case_cost(params: dict) -> float:
+    """Batch cost of a request if it used its whole max_tokens, input at ~4 chars/token."""
+    input_chars = sum(len(block["text"]) for m in params["messages"] for block in m["content"])
+    return CostTracker.estimate(params["model"], input_chars // 4, params["max_tokens"], batch=True)
+
+
+def _get_already_extracted_ids() -> frozenset[str]:
+    """Return source_ids that already have problems in the DB.
+
+    The result is cached until the DB (or its write-ahead log) changes, so
+    repeated calls in one process only scan open_problems once.
+    """
     db_path = RESULTS_DIR / "collector.db"
     if not db_path.exists():
-        return set()
+        return frozenset()
     try:
-        conn = sqlite3.connect(str(db_path))
-        rows = conn.execute(
-            "SELECT DISTINCT source_ids FROM open_problems"
-        ).fetchall()
-        conn.close()
-        # source_ids is a JSON array — extract individual IDs
-        ids = set()
-        for r in rows:
-            try:
-                for sid in json.loads(r[0]):
-                    ids.add(sid)
-            except (json.JSONDecodeError, TypeError):
-                pass
-        return ids
+        return _load_extracted_ids(str(db_path), _file_version(db_path),
+                                   _file_version(db_path.with_name(db_path.name + "-wal")))
     except Exception:
-        return set()
+        # Not cached, so a transient failure doesn't stick
+        return frozenset()
+
+
+def _file_version(path: Path) -> tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=4)
+def _load_extracted_ids(db_path: str, db_version, wal_version) -> frozenset[str]:
+    import sqlite3
+    from contextlib import closing
+    with closing(sqlite3.connect(db_path)) as conn:
+        conn.execute("PRAGMA query_only = 1")
+        # source_ids is a JSON array — let SQLite flatten it to individual IDs
+        return frozenset(
+            r[0] for r in conn.execute(
+                """SELECT DISTINCT j.value
+                   FROM open_problems, json_each(open_problems.source_ids) AS j
+                   WHERE json_valid(open_problems.source_ids)"""
+            )
+        )
+
+
+def _group_identical_inputs(sources: list[Source]) -> list[list[Source]]:
+    """Group sources that would send Sonnet the same passages, in first-seen order."""
+    groups = {}
+    for source in sources:
+        # The prompt template depends on the source type; the title is only
+        # context, so the same passages under another title still match
+        key = hashlib.blake2b(
+            f"{source.source_type == 'elife_review'}\0{_build_extraction_input(source)}".encode(),
+            digest_size=16,
+        ).digest()
+        groups.setdefault(key, []).append(source)
+    return list(groups.values())
+
+
+def _copy_to_duplicates(groups: list[list[Source]]) -> list[Source]:
+    """Give each group's other sources a copy of its first source's problems."""
+    duplicates = []
+    for first, *rest in groups:
+        if rest:
+            problems = orjson.dumps(first.problems)
+            for source in rest:
+                source.problems = orjson.loads(problems)
+            duplicates.extend(rest)
+    return duplicates
 
 
 async def extract_problems(
@@ -346,10 +661,13 @@ async def extract_problems(
     max_concurrent = llm_cfg["max_concurrent_requests"]
     retry_attempts = llm_cfg["retry_attempts"]
     max_calls = budget_cfg["max_sonnet_calls"]
+    batch_threshold = llm_cfg.get("batch_threshold", 50)
 
     # Skip sources already extracted in DB or current run checkpoint
     db_done = _get_already_extracted_ids()
-    cp_done = load_incremental_checkpoint(run_id, "stage3")
+    # Checkpointed sources are kept in memory to merge with this run's results
+    done_sources = load_incremental_sources(run_id, "stage3")
+    cp_done = set(done_sources)
     already_done = db_done | cp_done
     remaining = [s for s in sources if s.source_id not in already_done]
 
@@ -357,49 +675,65 @@ async def extract_problems(
         logger.info("Resuming Stage 3: %d already done (%d from DB, %d from checkpoint), %d remaining",
                      len(already_done), len(db_done), len(cp_done), len(remaining))
 
+    # Sources whose exact request has been answered before are served from
+    # the response cache and don't count against the budget
+    cache = _ResponseCache(RESPONSE_CACHE_PATH)
+    cached = []
+    uncached = []
+    for source in remaining:
+        problems = cache.get(_build_request_params(source, model))
+        if problems is None:
+            uncached.append(source)
+        else:
+            source.problems = problems
+            cached.append(source)
+    if cached:
+        logger.info("Response cache: %d sources served without an API call", len(cached))
+        write_incremental_checkpoint(run_id, "stage3", cached)
+
+    # Sources with identical extraction input are sent once; the rest copy
+    # that result afterwards
+    groups = _group_identical_inputs(uncached)
+    remaining = [group[0] for group in groups]
+    if len(remaining) < len(uncached):
+        logger.info("Deduplicated %d sources with identical passages into %d requests",
+                     len(uncached), len(remaining))
+
     # Budget check
     if len(remaining) > max_calls:
         logger.warning("Budget guard: %d sources exceeds max_sonnet_calls (%d). Truncating.",
                         len(remaining), max_calls)
         remaining = remaining[:max_calls]
+        groups = groups[:max_calls]
 
     client = anthropic.AsyncAnthropic()
-    semaphore = asyncio.Semaphore(max_concurrent)
-
-    # Process in batches for incremental checkpointing
-    batch_size = 10
-    all_extracted = []
 
-    for i in range(0, len(remaining), batch_size):
-        batch = remaining[i:i + batch_size]
-        logger.info("Extracting batch %d-%d of %d",
-                     i + 1, min(i + batch_size, len(remaining)), len(remaining))
-
-        tasks = [
-            _extract_one(client, source, model, semaphore, cost_tracker, retry_attempts)
-            for source in batch
-        ]
-        results = await asyncio.gather(*tasks)
-        all_extracted.extend(results)
+    # Large runs go through the Message Batches API (half price, not
+    # latency-sensitive); small ones and failed batch requests run directly
+    if remaining and len(remaining) >= batch_threshold:
+        all_extracted, remaining = await _extract_with_batch_api(
+            client, remaining, run_id, model, cost_tracker,
+            llm_cfg.get("batch_poll_interval", 30.0), cache=cache,
+        )
+        if remaining:
+            logger.info("Retrying %d failed batch requests individually", len(remaining))
+    else:
+        all_extracted = []
 
-        # Incremental checkpoint
-        write_incremental_checkpoint(run_id, "stage3", results)
+    all_extracted = cached + all_extracted + await _extract_individually(
+        client, remaining, run_id, model, max_concurrent, cost_tracker, retry_attempts, cache,
+    )
 
-        if cost_tracker:
-            cost_tracker.log_status()
+    # Groups whose first source was left out (budget) have nothing to copy
+    extracted_ids = {id(s) for s in all_extracted}
+    duplicates = _copy_to_duplicates([g for g in groups if id(g[0]) in extracted_ids])
+    if duplicates:
+        write_incremental_checkpoint(run_id, "stage3", duplicates)
+        all_extracted += duplicates
 
     # Merge with previously checkpointed results
-    if already_done:
-        cp_path = CHECKPOINTS_DIR / f"{run_id}_stage3_incremental.jsonl"
-        if cp_path.exists():
-            done_sources = {}
-            with open(cp_path) as f:
-                for line in f:
-                    line = line.strip()
-                    if line:
-                        d = json.loads(line)
-                        done_sources[d["source_id"]] = Source.from_dict(d)
-            all_extracted = list(done_sources.values())
+    done_sources.update((s.source_id, s) for s in all_extracted)
+    all_extracted = list(done_sources.values())
 
     sources_with_problems = [s for s in all_extracted if s.problems]
     total_problems = sum(len(s.problems) for s in sources_with_problems)
@@ -1,12 +1,173 @@
 """Stage 2: Open problem signal filter for source text passages."""
 
 import logging
+import os
 import re
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 
 from pipeline import Source, load_signal_phrases
 
+try:
+    import ahocorasick
+except ImportError:  # fall back to regex search per category
+    ahocorasick = None
+
 logger = logging.getLogger("collector.signal_filter")
 
+# Joins paragraphs for a whole-document scan; no signal phrase contains it
+_SEPARATOR = "\n\x1e\n"
+
+# Below this many sources, scanning in-process is faster than starting
+# worker processes (filter_sources' default; an explicit workers= is honoured)
+PARALLEL_MIN_SOURCES = 500
+
+# Signal categories in classification priority order: (label, phrases key)
+CATEGORY_PRIORITY = (
+    ("A", "category_a"),
+    ("D", "category_d"),
+    ("C", "category_c"),
+    ("B", "category_b"),
+)
+
+
+def _trie_pattern(phrases: list[str]) -> str:
+    """Build a regex alternation of phrases, factored by common prefix.
+
+    "future work should" and "future studies should" share one "future "
+    branch, so re tries each shared prefix once per position instead of once
+    per phrase.
+    """
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class _PhraseMatcher:
+    """Regex matcher for a list of phrases (no pyahocorasick).
+
+    Phrases are lowercased and escaped once here; callers pass lowercased
+    text, so matching needs no IGNORECASE folding. All phrases are fused into
+    one prefix-factored alternation that answers "any match?" in a single
+    search; the per-phrase regexes only run to list the phrases once that
+    has succeeded.
+    """
+
+    def __init__(self, phrases: list[str]):
+        self.phrases = list(phrases)
+        self.pattern = None
+        self.patterns = []
+        if self.phrases:
+            lowered = [p.lower() for p in self.phrases]
+            self.pattern = re.compile(_trie_pattern(lowered))
+            self.patterns = [(re.compile(re.escape(p)), orig) for p, orig in zip(lowered, self.phrases)]
+
+    def matches(self, text_lower: str) -> list[str]:
+        """Return the phrases found in lowercased text, in configuration order."""
+        if self.pattern is None or not self.pattern.search(text_lower):
+            return []
+        return [orig for pat, orig in self.patterns if pat.search(text_lower)]
+
+    def search(self, text_lower: str) -> bool:
+        """Return True if any phrase occurs in lowercased text."""
+        return self.pattern is not None and self.pattern.search(text_lower) is not None
+
+
+class _CategoryAutomaton:
+    """One Aho-Corasick automaton over every category's phrases and the negatives.
+
+    A single pass over the lowercased paragraph finds all phrase hits at once;
+    classification then picks the highest-priority category that was hit.
+    """
+
+    _NEGATIVE = -1
+
+    def __init__(self, categories: list[tuple[str, list[str]]], negatives: list[str]):
+        self.labels = [label for label, _ in categories]
+        self.phrases = [list(phrases) for _, phrases in categories]
+        self.automaton = ahocorasick.Automaton()
+        for slot, phrases in enumerate(self.phrases):
+            for i, phrase in enumerate(phrases):
+                self._add(phrase, (slot, i))
+        for phrase in negatives:
+            self._add(phrase, (self._NEGATIVE, 0))
+        if len(self.automaton):
+            self.automaton.make_automaton()
+        else:
+            self.automaton = None
+
+    def _add(self, phrase: str, entry: tuple[int, int]) -> None:
+        # Phrases that lowercase to the same key share one entry list
+        key = phrase.lower()
+        if key in self.automaton:
+            self.automaton.get(key).append(entry)
+        else:
+            self.automaton.add_word(key, [entry])
+
+    def classify(self, text_lower: str) -> tuple[str | None, list[str]]:
+        if self.automaton is None:
+            return None, []
+        hits = [set() for _ in self.labels]
+        for _, entries in self.automaton.iter(text_lower):
+            for slot, i in entries:
+                if slot == self._NEGATIVE:
+                    return None, []
+                hits[slot].add(i)
+        return self._resolve(hits)
+
+    def classify_many(self, texts_lower: list[str]) -> list[tuple[str | None, list[str]]]:
+        """classify() for each text, with a single automaton scan over all of them.
+
+        The texts are joined with a separator no phrase can span, and each hit
+        is mapped back to its text by binary search over the start offsets.
+        """
+        if self.automaton is None or not texts_lower:
+            return [(None, []) for _ in texts_lower]
+        starts = []
+        offset = 0
+        for text in texts_lower:
+            starts.append(offset)
+            offset += len(text) + len(_SEPARATOR)
+
+        hits = [None] * len(texts_lower)
+        negative = set()
+        for end, entries in self.automaton.iter(_SEPARATOR.join(texts_lower)):
+            idx = bisect_right(starts, end) - 1
+            if idx in negative:
+                continue
+            if hits[idx] is None:
+                hits[idx] = [set() for _ in self.labels]
+            for slot, i in entries:
+                if slot == self._NEGATIVE:
+                    negative.add(idx)
+                    break
+                hits[idx][slot].add(i)
+
+        return [
+            (None, []) if found is None or idx in negative else self._resolve(found)
+            for idx, found in enumerate(hits)
+        ]
+
+    def _resolve(self, hits: list[set[int]]) -> tuple[str | None, list[str]]:
+        """Pick the highest-priority category with hits and list its phrases."""
+        for label, phrases, found in zip(self.labels, self.phrases, hits):
+            if found:
+                return label, [phrases[i] for i in sorted(found)]
+        return None, []
+
 
 class SignalFilter:
     """Regex-based passage filter with configurable phrase categories.
@@ -18,111 +179,113 @@ class SignalFilter:
 
     def __init__(self, phrases: dict | None = None):
         phrases = phrases or load_signal_phrases()
-
-        # Pre-compile patterns (case-insensitive)
-        self.cat_a_patterns = [
-            re.compile(re.escape(p), re.IGNORECASE)
-            for p in phrases.get("category_a", [])
-        ]
-        self.cat_b_patterns = [
-            re.compile(re.escape(p), re.IGNORECASE)
-            for p in phrases.get("category_b", [])
-        ]
-        self.cat_c_patterns = [
-            re.compile(re.escape(p), re.IGNORECASE)
-            for p in phrases.get("category_c", [])
-        ]
-        self.cat_d_patterns = [
-            re.compile(re.escape(p), re.IGNORECASE)
-            for p in phrases.get("category_d", [])
-        ]
-        self.negative_patterns = [
-            re.compile(re.escape(p), re.IGNORECASE)
-            for p in phrases.get("negative_filters", [])
-        ]
-
-    def _match_category(self, text: str, patterns: list) -> list[str]:
-        """Return list of matched phrase strings."""
-        matched = []
-        for pat in patterns:
-            if pat.search(text):
-                matched.append(re.sub(r"\\(.)", r"\1", pat.pattern))
-        return matched
-
-    def _has_negative(self, text: str) -> bool:
-        """Check if text matches any negative filter."""
-        return any(pat.search(text) for pat in self.negative_patterns)
+        self.phrases = phrases
+        categories = [(label, phrases.get(key, [])) for label, key in CATEGORY_PRIORITY]
+        negatives = phrases.get("negative_filters", [])
+
+        # An empty phrase matches everywhere, which only the regex path handles
+        all_phrases = [p for _, ps in categories for p in ps] + negatives
+        if ahocorasick is not None and all(all_phrases):
+            self.automaton = _CategoryAutomaton(categories, negatives)
+        else:
+            self.automaton = None
+            # One matcher per category, in priority order
+            self.category_matchers = [(label, _PhraseMatcher(ps)) for label, ps in categories]
+            self.negative_matcher = _PhraseMatcher(negatives)
 
     def _classify_paragraph(self, paragraph: str) -> tuple[str | None, list[str]]:
         """Classify a paragraph and return (category, matched_phrases) or (None, []).
 
-        Priority: A > C > B. A single match in any category is sufficient.
+        Priority: A > D > C > B. A single match in any category is sufficient.
         """
-        if self._has_negative(paragraph):
-            return None, []
+        paragraph = paragraph.lower()
+        if self.automaton is not None:
+            return self.automaton.classify(paragraph)
 
-        a_matches = self._match_category(paragraph, self.cat_a_patterns)
-        if a_matches:
-            return "A", a_matches
-
-        d_matches = self._match_category(paragraph, self.cat_d_patterns)
-        if d_matches:
-            return "D", d_matches
-
-        c_matches = self._match_category(paragraph, self.cat_c_patterns)
-        if c_matches:
-            return "C", c_matches
+        if self.negative_matcher.search(paragraph):
+            return None, []
 
-        b_matches = self._match_category(paragraph, self.cat_b_patterns)
-        if b_matches:
-            return "B", b_matches
+        for label, matcher in self.category_matchers:
+            matched = matcher.matches(paragraph)
+            if matched:
+                return label, matched
 
         return None, []
 
+    def _classify_paragraphs(self, paragraphs: list[str]) -> list[tuple[str | None, list[str]]]:
+        """_classify_paragraph for each paragraph; one automaton scan when available."""
+        if self.automaton is not None:
+            return self.automaton.classify_many([p.lower() for p in paragraphs])
+        return [self._classify_paragraph(p) for p in paragraphs]
+
     def filter_source(self, source: Source) -> Source:
         """Find signal passages in a source document.
 
         Scans each paragraph in every section (or full text if no sections).
         Populates source.signal_passages with matching passages.
         """
-        source.signal_passages = []
-
-        if source.sections:
-            for section_name, section_text in source.sections.items():
-                self._scan_text(source, section_text, section_name)
-        elif source.full_text:
-            self._scan_text(source, source.full_text, "full_text")
-
-        logger.debug("Source %s: %d signal passages (A=%d, B=%d, C=%d, D=%d)",
-                      source.source_id, len(source.signal_passages),
-                      sum(1 for p in source.signal_passages if p["signal_category"] == "A"),
-                      sum(1 for p in source.signal_passages if p["signal_category"] == "B"),
-                      sum(1 for p in source.signal_passages if p["signal_category"] == "C"),
-                      sum(1 for p in source.signal_passages if p["signal_category"] == "D"))
-
+        source.signal_passages = self._find_passages(source.sections, source.full_text)
+        _log_source_counts(source)
         return source
 
-    def _scan_text(self, source: Source, text: str, section_name: str) -> None:
-        """Scan text for signal passages and append to source.signal_passages."""
-        paragraphs = _split_paragraphs(text)
+    def _find_passages(self, sections: dict, full_text: str) -> list[dict]:
+        """Return the signal passages in a document's sections (or full text).
 
-        for paragraph in paragraphs:
-            if len(paragraph.strip()) < 50:  # Skip very short paragraphs
-                continue
+        Paragraphs from every section are classified together, in one
+        automaton scan per document rather than one per section.
+        """
+        texts = sections.items() if sections else [("full_text", full_text)] if full_text else []
+        paragraphs = []
+        paragraph_sections = []
+        for section_name, text in texts:
+            # Skip very short paragraphs by their offsets, before slicing them out
+            for start, end in _paragraph_spans(text):
+                if end - start >= 50:
+                    paragraphs.append(text[start:end])
+                    paragraph_sections.append(section_name)
+
+        return [
+            {
+                "signal_category": category,
+                "matched_phrases": matched_phrases,
+                "context_text": paragraph,
+                "section": section_name,
+            }
+            for paragraph, section_name, (category, matched_phrases) in zip(
+                paragraphs, paragraph_sections, self._classify_paragraphs(paragraphs)
+            )
+            if category
+        ]
 
-            category, matched_phrases = self._classify_paragraph(paragraph)
-            if category:
-                source.signal_passages.append({
-                    "signal_category": category,
-                    "matched_phrases": matched_phrases,
-                    "context_text": paragraph.strip(),
-                    "section": section_name,
-                })
+    def filter_sources(self, sources: list[Source], workers: int | None = None) -> list[Source]:
+        """Filter all sources, returning those with at least one signal passage.
 
-    def filter_sources(self, sources: list[Source]) -> list[Source]:
-        """Filter all sources, returning those with at least one signal passage."""
-        for source in sources:
-            self.filter_source(source)
+        By default, runs of PARALLEL_MIN_SOURCES or more are scanned across
+        worker processes (one per CPU) and smaller ones in this process;
+        workers overrides that, with workers=1 always scanning in-process.
+        """
+        if workers is None:
+            workers = (os.cpu_count() or 1) if len(sources) >= PARALLEL_MIN_SOURCES else 1
+        workers = min(workers, len(sources))
+
+        if workers > 1:
+            # Workers build their own filter from the phrases and only get
+            # each source's text, so the Source objects never cross over
+            with ProcessPoolExecutor(
+                max_workers=workers, initializer=_init_worker, initargs=(self.phrases,),
+            ) as executor:
+                results = executor.map(
+                    _find_passages_in_worker,
+                    [s.sections for s in sources],
+                    [s.full_text for s in sources],
+                    chunksize=max(1, len(sources) // (workers * 4)),
+                )
+                for source, passages in zip(sources, results):
+                    source.signal_passages = passages
+                    _log_source_counts(source)
+        else:
+            for source in sources:
+                self.filter_source(source)
 
         with_signals = [s for s in sources if s.signal_passages]
         total_passages = sum(len(s.signal_passages) for s in with_signals)
@@ -133,17 +296,63 @@ class SignalFilter:
         )
 
         # Category breakdown
-        a_count = sum(1 for s in with_signals for p in s.signal_passages if p["signal_category"] == "A")
-        b_count = sum(1 for s in with_signals for p in s.signal_passages if p["signal_category"] == "B")
-        c_count = sum(1 for s in with_signals for p in s.signal_passages if p["signal_category"] == "C")
-        d_count = sum(1 for s in with_signals for p in s.signal_passages if p["signal_category"] == "D")
-        logger.info("  Category A: %d, B: %d, C: %d, D: %d", a_count, b_count, c_count, d_count)
+        counts = _category_counts(with_signals)
+        logger.info("  Category A: %d, B: %d, C: %d, D: %d",
+                    counts["A"], counts["B"], counts["C"], counts["D"])
 
         return with_signals
 
 
+# Per-process filter for filter_sources workers, built once by _init_worker
+_worker_filter: SignalFilter | None = None
+
+
+def _init_worker(phrases: dict) -> None:
+    global _worker_filter
+    _worker_filter = SignalFilter(phrases)
+
+
+def _find_passages_in_worker(sections: dict, full_text: str) -> list[dict]:
+    return _worker_filter._find_passages(sections, full_text)
+
+
+def _log_source_counts(source: Source) -> None:
+    if logger.isEnabledFor(logging.DEBUG):
+        counts = _category_counts([source])
+        logger.debug("Source %s: %d signal passages (A=%d, B=%d, C=%d, D=%d)",
+                      source.source_id, len(source.signal_passages),
+                      counts["A"], counts["B"], counts["C"], counts["D"])
+
+
+def _category_counts(sources: list[Source]) -> Counter:
+    """Count signal passages per category across sources, in one pass."""
+    return Counter(p["signal_category"] for s in sources for p in s.signal_passages)
+
+
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+_NON_SPACE_RE = re.compile(r"\S")
+
+
+def _paragraph_spans(text: str):
+    """Yield (start, end) of each stripped, non-empty paragraph in text.
+
+    Same paragraphs as _split_paragraphs, as offsets, so callers only copy
+    the ones they keep. Stripping works on the offsets as well, so no
+    intermediate string is built per paragraph.
+    """
+    search = _NON_SPACE_RE.search
+    breaks = [(m.start(), m.end()) for m in _PARAGRAPH_BREAK_RE.finditer(text)]
+    breaks.append((len(text), len(text)))
+    start = 0
+    for end, next_start in breaks:
+        m = search(text, start, end)
+        if m:
+            while text[end - 1].isspace():
+                end -= 1
+            yield m.start(), end
+        start = next_start
+
+
 def _split_paragraphs(text: str) -> list[str]:
     """Split text into paragraphs on blank lines or double newlines."""
-    # Split on two or more newlines (possibly with whitespace between)
-    paragraphs = re.split(r"\n\s*\n", text)
-    return [p.strip() for p in paragraphs if p.strip()]
+    return [text[start:end] for start, end in _paragraph_spans(text)]
@@ -10,12 +10,22 @@ Output:
 - data/results/feasibility_rankings.json
 """
 
-import json
+import os
 import re
 import statistics
 import sys
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+import orjson
+
+try:
+    import ahocorasick
+except ImportError:  # fall back to one regex search per keyword
+    ahocorasick = None
+
 # ---------------------------------------------------------------------------
 # Scoring config
 # ---------------------------------------------------------------------------
@@ -33,62 +43,65 @@ DECISION_THRESHOLDS = {"go_now": 0.50, "needs_specification": 0.35}
 CONFIDENCE_THRESHOLDS = {"go_now": 0.50, "needs_specification": 0.25}
 UNCERTAINTY_BASE = 0.50  # final = raw * (base + (1-base)*confidence)
 
+# Below this many problems, scoring is faster than starting worker processes
+PARALLEL_MIN_PROBLEMS = 1000
+
 BIOSAFETY = {
     "disqualifiers": {
         "score": 0.0,
-        "keywords": [
+        "keywords": (
             "bsl-3", "bsl-4", "select agent", "animal model", "mouse model",
             "mice", "rat model", "in vivo", "clinical trial", "human subjects",
             "patient enrollment", "primate", "mycobacterium tuberculosis",
             "sars-cov", "ebola", "influenza virus",
-        ],
+        ),
     },
     "bsl2_plus_viral": {
         "score": 0.2,
-        "keywords": [
+        "keywords": (
             "dengue", "live virus", "viral infection", "viral stock",
             "plaque assay", "viral propagation", "virus culture",
-        ],
+        ),
     },
     "bsl2_organisms": {
         "score": 0.5,
-        "keywords": [
+        "keywords": (
             "human primary cells", "primary human", "patient-derived",
             "human blood", "human tissue", "lentivirus", "adenovirus",
             "bsl-2", "salmonella", "staphylococcus", "pseudomonas",
-        ],
+        ),
     },
     "non_biological_materials": {
         "score": 0.9,
-        "keywords": [
+        "keywords": (
             "ceramic", "oxide", "electrolyte", "battery", "composite",
             "solid-state", "xrd", "eis", "gitt", "sims", "materials synthesis",
-        ],
+        ),
     },
     "safe_organisms": {
         "score": 1.0,
-        "keywords": [
+        "keywords": (
             "e. coli", "escherichia coli", "recombinant protein",
             "purified protein", "protein expression", "yeast",
             "saccharomyces", "hela", "hek293", "hek 293", "cho cells",
             "cos-7", "jurkat", "mcf-7", "a549", "nih 3t3", "3t3",
             "vero", "sf9", "insect cells", "in vitro", "cell-free",
-        ],
+        ),
     },
     "default_unknown_score": 0.4,
 }
 
 TECHNIQUE_ACCESSIBILITY = [
-    {"keywords": ["pcr", "qpcr", "qrt-pcr", "rt-pcr", "gel electrophoresis", "agarose gel", "cloning", "restriction digest", "ligation", "transformation"], "score": 1.0},
-    {"keywords": ["mic assay", "minimum inhibitory concentration", "broth microdilution", "antimicrobial susceptibility"], "score": 0.9},
-    {"keywords": ["cell culture", "viability assay", "mtt assay", "cytotoxicity", "proliferation assay", "cell viability"], "score": 0.8},
-    {"keywords": ["circular dichroism", "cd spectroscopy", "uv-vis"], "score": 0.7},
-    {"keywords": ["elisa", "binding assay", "plate reader", "colorimetric", "fluorescence assay"], "score": 0.8},
-    {"keywords": ["western blot", "protein purification", "chromatography", "his-tag", "affinity purification", "sds-page"], "score": 0.6},
-    {"keywords": ["flow cytometry", "facs", "microscopy", "fluorescence microscopy", "confocal"], "score": 0.5},
-    {"keywords": ["mass spectrometry", "nmr", "surface plasmon resonance", "spr", "isothermal titration", "itc", "hplc"], "score": 0.3},
-    {"keywords": ["cryo-em", "x-ray crystallography", "crystallography", "synchrotron", "saxs"], "score": 0.1},
-    {"keywords": ["custom equipment", "specialized instrument", "custom-built"], "score": 0.0},
+    {"keywords": ("pcr", "qpcr", "qrt-pcr", "rt-pcr", "gel electrophoresis", "agarose gel", "cloning", "restriction digest", "ligation", "transformation"), "score": 1.0},
+    {"keywords": ("mic assay", "minimum inhibitory concentration", "broth microdilution", "antimicrobial susceptibility"), "score": 0.9},
+    {"keywords": ("cell culture", "viability assay", "mtt assay", "cytotoxicity", "proliferation assay", "cell viability"), "score": 0.8},
+    {"keywords": ("circular dichroism", "cd spectroscopy", "uv-vis"), "score": 0.7},
+    {"keywords": ("elisa", "binding assay", "plate reader", "colorimetric", "fluorescence assay"), "score": 0.8},
+    {"keywords": ("western blot", "protein purification", "chromatography", "his-tag", "affinity purification", "sds-page"), "score": 0.6},
+    {"keywords": ("flow cytometry", "facs", "microscopy", "fluorescence microscopy", "confocal"), "score": 0.5},
+    {"keywords": ("mass spectrometry", "nmr", "surface plasmon resonance", "spr", "isothermal titration", "itc", "hplc"), "score": 0.3},
+    {"keywords": ("cryo-em", "x-ray crystallography", "crystallography", "synchrotron", "saxs"), "score": 0.1},
+    {"keywords": ("custom equipment", "specialized instrument", "custom-built"), "score": 0.0},
 ]
 TECHNIQUE_DEFAULT = 0.4
 
@@ -97,92 +110,212 @@ COST_BY_COMPLEXITY = {"simple": 1.0, "medium": 0.65, "complex": 0.35}
 REAGENT_AVAILABILITY = {
     "standard_catalog": {
         "score": 1.0,
-        "keywords": [
+        "keywords": (
             "commercially available", "sigma", "sigma-aldrich", "thermo",
             "thermo fisher", "invitrogen", "idt", "addgene", "atcc", "neb",
             "new england biolabs", "promega", "bio-rad", "abcam", "cell signaling",
-        ],
+        ),
     },
     "specialty_commercial": {
         "score": 0.7,
-        "keywords": [
+        "keywords": (
             "specialty supplier", "custom antibody", "cayman chemical",
             "tocris", "selleckchem", "medchemexpress",
-        ],
+        ),
     },
     "custom_synthesis": {
         "score": 0.5,
-        "keywords": [
+        "keywords": (
             "custom synthesis", "synthesized", "custom peptide",
             "custom dna", "custom oligo", "gene synthesis",
-        ],
+        ),
     },
     "author_specific": {
         "score": 0.2,
-        "keywords": [
+        "keywords": (
             "available upon request", "from the authors", "provided by",
             "gift from", "kindly provided",
-        ],
+        ),
     },
     "restricted": {
         "score": 0.0,
-        "keywords": ["restricted", "controlled substance", "unavailable", "discontinued"],
+        "keywords": ("restricted", "controlled substance", "unavailable", "discontinued"),
     },
     "default_unknown_score": 0.4,
 }
 
-EXPERIMENT_ACTION_KEYWORDS = [
+EXPERIMENT_ACTION_KEYWORDS = (
     "assay", "experiment", "mutagenesis", "gene editing", "knockout", "knock-in",
     "transformation", "culture", "screening", "reporter", "transfection",
     "insertion", "perturbation", "isotope tracing", "validation", "qtl", "gwas",
-]
-MEASUREMENT_ENDPOINT_KEYWORDS = [
+)
+MEASUREMENT_ENDPOINT_KEYWORDS = (
     "measure", "quantify", "evaluate", "compare", "efficiency", "activity",
     "expression", "growth", "binding", "stability", "viability", "flux",
     "yield", "rate", "correlat", "readout", "endpoint",
-]
-SYSTEM_KEYWORDS = [
+)
+SYSTEM_KEYWORDS = (
     "cell", "cells", "microbe", "microbial", "bacteria", "strain", "organism",
     "plant", "crop", "protein", "enzyme", "gene", "genome", "rna", "dna",
     "metabolite", "soil", "rhizosphere", "fermentation", "sample", "library",
-]
-CONTROL_DESIGN_KEYWORDS = [
+)
+CONTROL_DESIGN_KEYWORDS = (
     "control", "baseline", "wild-type", "versus", "vs.", "comparison", "matched",
-]
+)
 
-POLICY_ONLY_KEYWORDS = [
+POLICY_ONLY_KEYWORDS = (
     "policy", "regulatory", "governance", "international law", "incentive structures",
     "funding structures", "stakeholder", "capacity building", "cross-border",
-]
-INFRASTRUCTURE_ONLY_KEYWORDS = [
+)
+INFRASTRUCTURE_ONLY_KEYWORDS = (
     "monitoring sites", "observational networks", "infrastructure bottlenecks",
     "site distribution", "global network", "long-term site",
-]
-COMPUTATIONAL_ONLY_KEYWORDS = [
+)
+COMPUTATIONAL_ONLY_KEYWORDS = (
     "scenario modeling", "agent-based modeling", "survey", "gap analysis",
     "comparative policy analysis", "techno-economic analysis",
-]
-MULTI_YEAR_SCALE_KEYWORDS = [
+)
+MULTI_YEAR_SCALE_KEYWORDS = (
     "long-term", "multi-site", "multi-year", "global", "cross-border",
     "consortium", "worldwide", "regional and global scales",
-]
+)
+
+# Keyword groups shared by readiness, eligibility and tractability scoring
+SIGNAL_KEYWORD_GROUPS = {
+    "action": EXPERIMENT_ACTION_KEYWORDS,
+    "measurement": MEASUREMENT_ENDPOINT_KEYWORDS,
+    "system": SYSTEM_KEYWORDS,
+    "control": CONTROL_DESIGN_KEYWORDS,
+    "policy": POLICY_ONLY_KEYWORDS,
+    "infrastructure": INFRASTRUCTURE_ONLY_KEYWORDS,
+    "computational": COMPUTATIONAL_ONLY_KEYWORDS,
+    "long_scale": MULTI_YEAR_SCALE_KEYWORDS,
+}
 
 
 # ---------------------------------------------------------------------------
 # Keyword matching
 # ---------------------------------------------------------------------------
 
-def _contains_keyword(text_lower: str, keyword: str) -> bool:
-    kw = (keyword or "").strip().lower()
+@lru_cache(maxsize=4096)
+def _compile_keyword(keyword: str) -> re.Pattern | None:
+    """Whole-word pattern for a keyword (spaces match any whitespace run)."""
+    kw = keyword.strip().lower()
     if not kw:
-        return False
+        return None
     phrase = re.escape(kw).replace(r"\ ", r"\s+")
-    pattern = rf"(?<![a-z0-9]){phrase}(?![a-z0-9])"
-    return re.search(pattern, text_lower) is not None
+    return re.compile(rf"(?<![a-z0-9]){phrase}(?![a-z0-9])")
+
+
+def _all_keyword_lists() -> list[tuple[str, ...]]:
+    return [
+        *(tier["keywords"] for tier in BIOSAFETY.values() if isinstance(tier, dict)),
+        *(entry["keywords"] for entry in TECHNIQUE_ACCESSIBILITY),
+        *(tier["keywords"] for tier in REAGENT_AVAILABILITY.values() if isinstance(tier, dict)),
+        EXPERIMENT_ACTION_KEYWORDS, MEASUREMENT_ENDPOINT_KEYWORDS, SYSTEM_KEYWORDS,
+        CONTROL_DESIGN_KEYWORDS, POLICY_ONLY_KEYWORDS, INFRASTRUCTURE_ONLY_KEYWORDS,
+        COMPUTATIONAL_ONLY_KEYWORDS, MULTI_YEAR_SCALE_KEYWORDS,
+    ]
+
+
+# With pyahocorasick, every configured keyword goes into one automaton and a
+# text is scanned once for all of them. Whitespace runs in the text are
+# collapsed to single spaces first, which is what the regex's \s+ allows.
+_WHITESPACE_RE = re.compile(r"\s+")
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
+
+def _automaton_safe(key: str) -> bool:
+    # Other whitespace (tabs, repeated spaces) is matched literally or as
+    # \s+\s+ by the regex, which collapsed text can't reproduce
+    return bool(key) and " ".join(key.split()) == key
+
+
+def _build_keyword_automaton():
+    automaton = ahocorasick.Automaton()
+    for keywords in _all_keyword_lists():
+        for kw in keywords:
+            key = kw.strip().lower()
+            if _automaton_safe(key) and key not in automaton:
+                automaton.add_word(key, key)
+    automaton.make_automaton()
+    return automaton
+
+
+if ahocorasick is not None:
+    _KEYWORD_AUTOMATON = _build_keyword_automaton()
+else:
+    _KEYWORD_AUTOMATON = None
+    # Compile every configured keyword up front
+    for _keywords in _all_keyword_lists():
+        for _kw in _keywords:
+            _compile_keyword(_kw)
+
+
+@lru_cache(maxsize=256)
+def _keyword_hits(text_lower: str) -> frozenset[str]:
+    """Automaton keywords with a whole-word occurrence in text_lower."""
+    text = _WHITESPACE_RE.sub(" ", text_lower)
+    last = len(text) - 1
+    hits = set()
+    for end, key in _KEYWORD_AUTOMATON.iter(text):
+        if key in hits:
+            continue
+        start = end - len(key) + 1
+        if (start == 0 or text[start - 1] not in _WORD_CHARS) and (
+            end == last or text[end + 1] not in _WORD_CHARS
+        ):
+            hits.add(key)
+    return frozenset(hits)
+
+
+@lru_cache(maxsize=4096)
+def _in_automaton(keyword: str) -> str | None:
+    """The automaton key for keyword, or None if it must use the regex path."""
+    if _KEYWORD_AUTOMATON is None:
+        return None
+    key = keyword.strip().lower()
+    return key if _automaton_safe(key) and key in _KEYWORD_AUTOMATON else None
+
+
+def _find_keyword(text_lower: str, kw: str) -> bool:
+    """Whole-word search for a keyword without whitespace, via str.find.
+
+    Same result as the keyword's regex: a hit counts when the characters on
+    either side are not [a-z0-9].
+    """
+    n = len(kw)
+    idx = text_lower.find(kw)
+    while idx != -1:
+        end = idx + n
+        if (idx == 0 or text_lower[idx - 1] not in _WORD_CHARS) and (
+            end == len(text_lower) or text_lower[end] not in _WORD_CHARS
+        ):
+            return True
+        idx = text_lower.find(kw, idx + 1)
+    return False
+
+
+@lru_cache(maxsize=4096)
+def _plain_keyword(keyword: str) -> str | None:
+    """The lowercased keyword if str.find can match it (no whitespace), else None."""
+    kw = keyword.strip().lower()
+    return kw if kw and len(kw.split()) == 1 else None
 
 
-def _matched_keywords(text: str, keywords: list[str]) -> list[str]:
-    text_lower = text.lower()
+def _contains_keyword(text_lower: str, keyword: str) -> bool:
+    key = _in_automaton(keyword or "")
+    if key is not None:
+        return key in _keyword_hits(text_lower)
+    kw = _plain_keyword(keyword or "")
+    if kw is not None:
+        return _find_keyword(text_lower, kw)
+    pattern = _compile_keyword(keyword or "")
+    return pattern is not None and pattern.search(text_lower) is not None
+
+
+def _matched_keywords(text_lower: str, keywords: tuple[str, ...]) -> list[str]:
+    """Keywords with a whole-word match in text_lower (already lowercased)."""
     return [kw for kw in keywords if _contains_keyword(text_lower, kw)]
 
 
@@ -194,9 +327,9 @@ def _clamp(value: float, lo: float = 0.0, hi: float = 1.0) -> float:
 # Dimension scorers
 # ---------------------------------------------------------------------------
 
-def score_biosafety(text: str) -> tuple[float, dict]:
+def score_biosafety(text_lower: str) -> tuple[float, dict]:
     bio = BIOSAFETY
-    disq = _matched_keywords(text, bio["disqualifiers"]["keywords"])
+    disq = _matched_keywords(text_lower, bio["disqualifiers"]["keywords"])
     if disq:
         return 0.0, {"tier": "disqualifiers", "keywords": disq}
 
@@ -204,28 +337,29 @@ def score_biosafety(text: str) -> tuple[float, dict]:
         tier = bio.get(tier_key)
         if not tier:
             continue
-        m = _matched_keywords(text, tier["keywords"])
+        m = _matched_keywords(text_lower, tier["keywords"])
         if m:
             return float(tier["score"]), {"tier": tier_key, "keywords": m}
 
     return float(bio["default_unknown_score"]), {"tier": "default", "keywords": []}
 
 
-def score_technique(text: str) -> tuple[float, dict]:
+def score_technique(text_lower: str) -> tuple[float, dict]:
     matched = []
     for entry in TECHNIQUE_ACCESSIBILITY:
-        m = _matched_keywords(text, entry["keywords"])
+        m = _matched_keywords(text_lower, entry["keywords"])
         if m:
             matched.append({"score": entry["score"], "keywords": m})
 
     if not matched:
         return TECHNIQUE_DEFAULT, {"matched": [], "defaulted": True}
 
-    scores = sorted([e["score"] for e in matched])
+    scores = [e["score"] for e in matched]
     if len(scores) == 1:
         score = scores[0]
     else:
-        score = 0.4 * scores[0] + 0.6 * statistics.median(scores)
+        # median() sorts its own copy, so the minimum needs no sort of its own
+        score = 0.4 * min(scores) + 0.6 * statistics.median(scores)
 
     return score, {"matched": matched, "defaulted": False}
 
@@ -235,21 +369,31 @@ def score_cost(complexity: str) -> tuple[float, dict]:
     return float(COST_BY_COMPLEXITY.get(c, COST_BY_COMPLEXITY["medium"])), {"complexity": c}
 
 
-def score_reagent(text: str) -> tuple[float, dict]:
+def score_reagent(text_lower: str) -> tuple[float, dict]:
     for tier_key in ["restricted", "author_specific", "custom_synthesis", "specialty_commercial", "standard_catalog"]:
         tier = REAGENT_AVAILABILITY[tier_key]
-        m = _matched_keywords(text, tier["keywords"])
+        m = _matched_keywords(text_lower, tier["keywords"])
         if m:
             return float(tier["score"]), {"tier": tier_key, "keywords": m}
 
     return float(REAGENT_AVAILABILITY["default_unknown_score"]), {"tier": "default", "keywords": []}
 
 
-def score_readiness(text: str) -> tuple[float, dict]:
-    action_hits = _matched_keywords(text, EXPERIMENT_ACTION_KEYWORDS)
-    measure_hits = _matched_keywords(text, MEASUREMENT_ENDPOINT_KEYWORDS)
-    system_hits = _matched_keywords(text, SYSTEM_KEYWORDS)
-    control_hits = _matched_keywords(text, CONTROL_DESIGN_KEYWORDS)
+def _gather_signals(text_lower: str) -> dict[str, list[str]]:
+    """Match the readiness, eligibility and tractability keyword groups once.
+
+    Several scorers read the same groups; they all take this dict instead
+    of rescanning the text.
+    """
+    return {name: _matched_keywords(text_lower, keywords)
+            for name, keywords in SIGNAL_KEYWORD_GROUPS.items()}
+
+
+def score_readiness(signals: dict[str, list[str]]) -> tuple[float, dict]:
+    action_hits = signals["action"]
+    measure_hits = signals["measurement"]
+    system_hits = signals["system"]
+    control_hits = signals["control"]
 
     score = 0.0
     if action_hits:
@@ -273,14 +417,14 @@ def score_readiness(text: str) -> tuple[float, dict]:
     }
 
 
-def score_tractability(complexity: str, text: str) -> tuple[float, dict]:
+def score_tractability(complexity: str, signals: dict[str, list[str]]) -> tuple[float, dict]:
     c = (complexity or "medium").lower()
     score = float(COST_BY_COMPLEXITY.get(c, COST_BY_COMPLEXITY["medium"]))
 
     penalties = []
-    long_scale_hits = _matched_keywords(text, MULTI_YEAR_SCALE_KEYWORDS)
-    infra_hits = _matched_keywords(text, INFRASTRUCTURE_ONLY_KEYWORDS)
-    computational_only_hits = _matched_keywords(text, COMPUTATIONAL_ONLY_KEYWORDS)
+    long_scale_hits = signals["long_scale"]
+    infra_hits = signals["infrastructure"]
+    computational_only_hits = signals["computational"]
 
     if long_scale_hits:
         score -= 0.20
@@ -305,13 +449,13 @@ def score_tractability(complexity: str, text: str) -> tuple[float, dict]:
 # Eligibility + decisions
 # ---------------------------------------------------------------------------
 
-def evaluate_eligibility(text: str) -> dict:
-    action_hits = _matched_keywords(text, EXPERIMENT_ACTION_KEYWORDS)
-    measurement_hits = _matched_keywords(text, MEASUREMENT_ENDPOINT_KEYWORDS)
-    system_hits = _matched_keywords(text, SYSTEM_KEYWORDS)
-    policy_hits = _matched_keywords(text, POLICY_ONLY_KEYWORDS)
-    infra_hits = _matched_keywords(text, INFRASTRUCTURE_ONLY_KEYWORDS)
-    computational_hits = _matched_keywords(text, COMPUTATIONAL_ONLY_KEYWORDS)
+def evaluate_eligibility(signals: dict[str, list[str]]) -> dict:
+    action_hits = signals["action"]
+    measurement_hits = signals["measurement"]
+    system_hits = signals["system"]
+    policy_hits = signals["policy"]
+    infra_hits = signals["infrastructure"]
+    computational_hits = signals["computational"]
 
     reasons = []
     eligible = True
@@ -326,8 +470,10 @@ def evaluate_eligibility(text: str) -> dict:
         eligible = False
         reasons.append("missing_manipulable_system")
 
-    blocker_hits = sorted(set(policy_hits + infra_hits + computational_hits))
-    if blocker_hits and not action_hits:
+    # blocker_hits is published sorted and deduplicated; most texts have none
+    has_blockers = bool(policy_hits or infra_hits or computational_hits)
+    blocker_hits = sorted({*policy_hits, *infra_hits, *computational_hits}) if has_blockers else []
+    if has_blockers and not action_hits:
         eligible = False
         reasons.append("policy_or_infrastructure_or_modeling_without_bench_plan")
 
@@ -343,12 +489,18 @@ def evaluate_eligibility(text: str) -> dict:
     }
 
 
+_TIER_CUTS = (THRESHOLDS["medium"], THRESHOLDS["high"])
+_TIER_LABELS = ("low", "medium", "high")
+
+# Decisions from least to most ready; a sub-question reaches the level that
+# both its score and its confidence clear
+_DECISION_SCORE_CUTS = (DECISION_THRESHOLDS["needs_specification"], DECISION_THRESHOLDS["go_now"])
+_DECISION_CONFIDENCE_CUTS = (CONFIDENCE_THRESHOLDS["needs_specification"], CONFIDENCE_THRESHOLDS["go_now"])
+_DECISION_LABELS = ("needs_repositioning", "needs_specification", "go_now")
+
+
 def _tier_from_score(score: float) -> str:
-    if score >= THRESHOLDS["high"]:
-        return "high"
-    if score >= THRESHOLDS["medium"]:
-        return "medium"
-    return "low"
+    return _TIER_LABELS[bisect_right(_TIER_CUTS, score)]
 
 
 def _decision_from_scores(
@@ -361,17 +513,10 @@ def _decision_from_scores(
         return "needs_repositioning"
     if eligibility["blocker_hits"] and readiness_score < 0.5:
         return "needs_repositioning"
-    if (
-        final_score >= DECISION_THRESHOLDS["go_now"]
-        and confidence >= CONFIDENCE_THRESHOLDS["go_now"]
-    ):
-        return "go_now"
-    if (
-        final_score >= DECISION_THRESHOLDS["needs_specification"]
-        and confidence >= CONFIDENCE_THRESHOLDS["needs_specification"]
-    ):
-        return "needs_specification"
-    return "needs_repositioning"
+    return _DECISION_LABELS[min(
+        bisect_right(_DECISION_SCORE_CUTS, final_score),
+        bisect_right(_DECISION_CONFIDENCE_CUTS, confidence),
+    )]
 
 
 # ---------------------------------------------------------------------------
@@ -384,15 +529,22 @@ def score_sub_question(sq: dict) -> dict:
         sq.get("evidence_needed", ""),
         " ".join(sq.get("disciplines", [])),
     ])
-    complexity = sq.get("estimated_complexity", "medium")
-
-    eligibility = evaluate_eligibility(text)
-    bio_score, bio_detail = score_biosafety(text)
-    tech_score, tech_detail = score_technique(text)
-    reagent_score, reagent_detail = score_reagent(text)
+    # A fresh top-level dict per call; the nested details are shared between
+    # sub-questions with the same text and must be treated as read-only
+    return dict(_score_text(text.lower(), sq.get("estimated_complexity", "medium")))
+
+
+@lru_cache(maxsize=8192)
+def _score_text(text_lower: str, complexity: str) -> dict:
+    """Score a sub-question's lowercased text; memoized for repeated sub-questions."""
+    signals = _gather_signals(text_lower)
+    eligibility = evaluate_eligibility(signals)
+    bio_score, bio_detail = score_biosafety(text_lower)
+    tech_score, tech_detail = score_technique(text_lower)
+    reagent_score, reagent_detail = score_reagent(text_lower)
     cost_score, cost_detail = score_cost(complexity)
-    readiness_score, readiness_detail = score_readiness(text)
-    tractability_score, tractability_detail = score_tractability(complexity, text)
+    readiness_score, readiness_detail = score_readiness(signals)
+    tractability_score, tractability_detail = score_tractability(complexity, signals)
 
     raw_score = (
         WEIGHTS["biosafety"] * bio_score
@@ -488,6 +640,17 @@ def score_problem(problem: dict) -> dict:
     }
 
 
+def score_problems(problems: list[dict]) -> list[dict]:
+    """score_problem for each problem, across worker processes for large feeds."""
+    workers = os.cpu_count() or 1
+    if workers == 1 or len(problems) < PARALLEL_MIN_PROBLEMS:
+        return [score_problem(p) for p in problems]
+    # Keyword tables and automata are built at import, once per worker
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(score_problem, problems,
+                                 chunksize=max(1, len(problems) // (workers * 4))))
+
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -498,11 +661,9 @@ def main():
         print(f"ERROR: {feed_path} not found", file=sys.stderr)
         sys.exit(1)
 
-    with open(feed_path) as f:
-        data = json.load(f)
-
-    problems = data["problems"]
-    scored = [score_problem(p) for p in problems]
+    # Keep only the problem list; the rest of the feed is released right away
+    problems = orjson.loads(feed_path.read_bytes())["problems"]
+    scored = score_problems(problems)
     decision_rank = {"go_now": 0, "needs_specification": 1, "needs_repositioning": 2}
     scored.sort(key=lambda x: (decision_rank[x["decision_bucket"]], -x["best_score"]))
 
@@ -522,8 +683,7 @@ def main():
     }
 
     out_path = feed_path.parent / "feasibility_rankings.json"
-    with open(out_path, "w") as f:
-        json.dump(out, f, indent=2)
+    out_path.write_bytes(orjson.dumps(out, option=orjson.OPT_INDENT_2))
 
     print("\n" + "=" * 72)
     print(f"FEASIBILITY GO/NO-GO RANKING (v2) — {len(scored)} open problems")
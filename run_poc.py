@@ -15,8 +15,8 @@ from pipeline.ingest_reviews import ingest_elife_reviews_sync
 from pipeline.signal_filter import SignalFilter
 from pipeline.problem_extractor import extract_problems_sync
 from pipeline.output import (
-    init_db, upsert_source, upsert_problem, upsert_sub_question,
-    record_pipeline_run, export_json_feed, build_provenance,
+    init_db, bulk_write, upsert_source, upsert_problem, upsert_sub_question,
+    PendingWrites, flush_pending, record_pipeline_run, export_json_feed, build_provenances,
 )
 
 
@@ -153,18 +153,18 @@ def main():
     # ── Stage 6: Output ──────────────────────────────────────────────
     logger.info("Stage 6: Writing output...")
     conn = init_db()
-    for source in extracted:
-        upsert_source(conn, source)
-        for problem in source.problems:
-            provenance = build_provenance(source, problem)
-            problem_id = upsert_problem(conn, run_id, source.source_id, problem, provenance)
-            for sq in problem.get("sub_questions", []):
-                upsert_sub_question(conn, problem_id, sq, source.source_id)
-    conn.commit()
-
     stats["total_cost"] = cost_tracker.total_cost
-    record_pipeline_run(conn, stats)
-    conn.commit()
+    pending = PendingWrites()
+    with bulk_write(conn) as now:
+        for source in extracted:
+            upsert_source(conn, source, now)
+            for problem, provenance in zip(source.problems, build_provenances(source)):
+                problem_id = upsert_problem(conn, run_id, source.source_id, problem, provenance,
+                                            pending, now)
+                for sq in problem.get("sub_questions", []):
+                    upsert_sub_question(conn, problem_id, sq, source.source_id, pending)
+        flush_pending(conn, pending)
+        record_pipeline_run(conn, stats, now)
 
     feed_path = export_json_feed(conn, run_id)
     conn.close()
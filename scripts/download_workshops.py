@@ -3,24 +3,38 @@
 
 Scrapes the DOE BER workshop reports listing page for PDF links,
 downloads them to data/workshops/, and creates YAML sidecar files.
-Skips files that already exist.
+Skips files that already exist, or with --refresh re-checks them with a
+conditional GET (ETag / Last-Modified from the sidecar) and replaces any
+that changed.
 
 Usage:
-    python scripts/download_workshops.py [--dry-run]
+    python scripts/download_workshops.py [--dry-run] [--refresh]
 """
 
 import argparse
+import asyncio
 import sys
 from pathlib import Path
 
 import httpx
 import yaml
 
+try:
+    from yaml import CSafeDumper as YamlDumper, CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without LibYAML
+    from yaml import SafeDumper as YamlDumper, SafeLoader as YamlLoader
+
 ROOT = Path(__file__).resolve().parent.parent
 WORKSHOPS_DIR = ROOT / "data" / "workshops"
 
 DOE_BASE = "https://science.osti.gov"
 
+# Reports fetched at once; they all come from the same host
+MAX_CONCURRENT_DOWNLOADS = 8
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# Coalesces the streamed chunks into fewer, larger writes
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 # Additional DOE BER workshop reports to download (beyond already-collected 8).
 # Manually curated from the BER listing page — focused on biology/bioenergy topics.
 DOE_REPORTS = [
@@ -79,13 +93,24 @@ NIH_REPORTS = [
 ]
 
 
-def download_report(report: dict, dry_run: bool = False) -> bool:
-    """Download a single workshop report PDF and create YAML sidecar."""
+async def download_report(
+    client: httpx.AsyncClient,
+    semaphore: asyncio.Semaphore,
+    report: dict,
+    existing: set[str],
+    dry_run: bool = False,
+    refresh: bool = False,
+) -> bool:
+    """Download a single workshop report PDF and create YAML sidecar.
+
+    With refresh, a report already on disk is requested conditionally on
+    the validators saved in its sidecar and only rewritten if it changed.
+    """
     source_id = report["source_id"]
     pdf_dest = WORKSHOPS_DIR / f"{source_id}.pdf"
     yaml_dest = WORKSHOPS_DIR / f"{source_id}.yaml"
 
-    if pdf_dest.exists():
+    if source_id in existing and not refresh:
         print(f"  SKIP {source_id} (already exists)")
         return False
 
@@ -102,16 +127,30 @@ def download_report(report: dict, dry_run: bool = False) -> bool:
         print(f"  DRY RUN: would download {source_id} from {url}")
         return False
 
-    print(f"  Downloading {source_id}...")
-    try:
-        with httpx.Client(timeout=60.0, follow_redirects=True) as client:
-            resp = client.get(url)
-            resp.raise_for_status()
-            pdf_dest.write_bytes(resp.content)
-            print(f"    Saved {pdf_dest.name} ({len(resp.content) / 1024 / 1024:.1f} MB)")
-    except httpx.HTTPError as e:
-        print(f"    FAILED: {e}")
-        return False
+    headers = _conditional_headers(yaml_dest) if source_id in existing else {}
+
+    # Stream to a .part file so an interrupted download isn't skipped next run
+    part_dest = pdf_dest.with_name(pdf_dest.name + ".part")
+    async with semaphore:
+        print(f"  Downloading {source_id}...")
+        total = 0
+        try:
+            async with client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code == 304:
+                    print(f"    {source_id} unchanged")
+                    return False
+                resp.raise_for_status()
+                with open(part_dest, "wb", buffering=WRITE_BUFFER_SIZE) as f:
+                    async for chunk in resp.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+                        total += len(chunk)
+        except httpx.HTTPError as e:
+            part_dest.unlink(missing_ok=True)
+            print(f"    FAILED {source_id}: {e}")
+            return False
+    part_dest.replace(pdf_dest)
+    existing.add(source_id)
+    print(f"    Saved {pdf_dest.name} ({total / 1024 / 1024:.1f} MB)")
 
     # Write YAML sidecar
     sidecar = {
@@ -121,33 +160,74 @@ def download_report(report: dict, dry_run: bool = False) -> bool:
         "date_published": report["date_published"],
         "url": report["url"],
     }
+    # Validators for the next --refresh
+    for key, header in _VALIDATOR_HEADERS:
+        if resp.headers.get(header):
+            sidecar[key] = resp.headers[header]
     with open(yaml_dest, "w") as f:
-        yaml.dump(sidecar, f, default_flow_style=False)
+        yaml.dump(sidecar, f, Dumper=YamlDumper, default_flow_style=False)
 
     return True
 
 
+# (sidecar key, response header) pairs saved for conditional re-downloads
+_VALIDATOR_HEADERS = (("etag", "etag"), ("last_modified", "last-modified"))
+
+
+def _conditional_headers(yaml_dest: Path) -> dict[str, str]:
+    """Build If-None-Match / If-Modified-Since headers from a report's sidecar."""
+    try:
+        with open(yaml_dest) as f:
+            sidecar = yaml.load(f, Loader=YamlLoader) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+    headers = {}
+    if sidecar.get("etag"):
+        headers["If-None-Match"] = sidecar["etag"]
+    if sidecar.get("last_modified"):
+        headers["If-Modified-Since"] = sidecar["last_modified"]
+    return headers
+
+
+async def download_reports(
+    reports: list[dict], existing: set[str], dry_run: bool = False, refresh: bool = False,
+) -> list[bool]:
+    """Download reports concurrently over one shared client.
+
+    existing holds the source ids already on disk; downloaded ones are added.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    # HTTP/2 multiplexes the concurrent downloads over pooled connections
+    limits = httpx.Limits(max_connections=MAX_CONCURRENT_DOWNLOADS,
+                          max_keepalive_connections=MAX_CONCURRENT_DOWNLOADS)
+    async with httpx.AsyncClient(
+        http2=True, timeout=60.0, follow_redirects=True, limits=limits,
+    ) as client:
+        return await asyncio.gather(
+            *(download_report(client, semaphore, r, existing, dry_run, refresh) for r in reports)
+        )
+
+
 def main():
     parser = argparse.ArgumentParser(description="Download additional workshop PDFs")
     parser.add_argument("--dry-run", action="store_true", help="Show what would be downloaded")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-check existing reports and download any that changed")
     args = parser.parse_args()
 
     WORKSHOPS_DIR.mkdir(parents=True, exist_ok=True)
 
     print(f"Workshop directory: {WORKSHOPS_DIR}")
-    existing = list(WORKSHOPS_DIR.glob("*.pdf"))
+    # One directory scan; downloads are tracked in the set from here on
+    existing = {p.stem for p in WORKSHOPS_DIR.glob("*.pdf")}
     print(f"Existing PDFs: {len(existing)}")
 
-    downloaded = 0
-
     print("\n--- DOE BER Reports ---")
-    for report in DOE_REPORTS:
-        if download_report(report, args.dry_run):
-            downloaded += 1
+    results = asyncio.run(download_reports(DOE_REPORTS, existing, args.dry_run, args.refresh))
+    downloaded = sum(results)
 
     print(f"\nDownloaded {downloaded} new workshop reports")
-    total = len(list(WORKSHOPS_DIR.glob("*.pdf")))
-    print(f"Total PDFs in workshops/: {total}")
+    print(f"Total PDFs in workshops/: {len(existing)}")
 
 
 if __name__ == "__main__":
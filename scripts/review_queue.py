@@ -3,13 +3,50 @@
 
 import argparse
 import csv
-import json
 import sqlite3
 from pathlib import Path
 
+import orjson
+
 ROOT_DIR = Path(__file__).resolve().parent.parent
 RESULTS_DIR = ROOT_DIR / "data" / "results"
 
+QUEUE_FIELDS = [
+    "run_id",
+    "problem_id",
+    "scope",
+    "domain",
+    "subdomain",
+    "mention_count",
+    "source_count",
+    "subq_count",
+    "flag_policy_or_regulatory",
+    "flag_computational_like",
+    "flag_missing_subqs_for_decomposable",
+    "problem_statement",
+    "related_keywords",
+    "source_ids",
+    "source_types",
+    "source_titles",
+]
+# The queue columns plus the ones the reviewer fills in, exported blank
+ADJUDICATION_FIELDS = QUEUE_FIELDS + [
+    "decision",
+    "priority",
+    "merge_into_problem_id",
+    "in_scope",
+    "decomposition_quality",
+    "reviewer_notes",
+]
+_REVIEWER_BLANKS = ("",) * (len(ADJUDICATION_FIELDS) - len(QUEUE_FIELDS))
+
+# Connection-local settings only; the export never writes to the DB
+_READ_PRAGMAS = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",      # 64 MiB page cache
+    "PRAGMA mmap_size=268435456",    # 256 MiB memory-mapped I/O
+)
+
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
@@ -55,16 +92,20 @@ def _safe_json_list(raw: str | None) -> list[str]:
     if not raw:
         return []
     try:
-        data = json.loads(raw)
+        data = orjson.loads(raw)
         if isinstance(data, list):
             return [str(x) for x in data]
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         pass
     return []
 
 
-def _load_review_rows(conn: sqlite3.Connection, run_id: str) -> list[dict]:
-    rows = conn.execute(
+def _iter_review_rows(conn: sqlite3.Connection, run_id: str):
+    """Yield one review-queue row tuple per problem in the run, in queue order."""
+    # Plain tuples for the problem rows; they're unpacked once per row below
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    rows = cursor.execute(
         """
         SELECT
           op.id AS problem_id,
@@ -75,7 +116,39 @@ def _load_review_rows(conn: sqlite3.Connection, run_id: str) -> list[dict]:
           op.source_ids,
           op.related_keywords,
           op.canonical_statement AS problem_statement,
-          COUNT(sq.id) AS subq_count
+          COUNT(sq.id) AS subq_count,
+          -- Titles in source_ids order (falling back to the id), and the
+          -- distinct source types sorted, for the ids found in sources
+          (SELECT group_concat(title, ' | ') FROM (
+             SELECT coalesce(nullif(s.title, ''), s.id) AS title
+             FROM json_each(CASE WHEN json_valid(op.source_ids)
+                                  AND json_type(op.source_ids) = 'array'
+                                 THEN op.source_ids END) AS j
+             JOIN sources s ON s.id = CAST(j.value AS TEXT)
+             ORDER BY j.key
+          )) AS source_titles,
+          (SELECT group_concat(source_type, ' | ') FROM (
+             SELECT DISTINCT s.source_type
+             FROM json_each(CASE WHEN json_valid(op.source_ids)
+                                  AND json_type(op.source_ids) = 'array'
+                                 THEN op.source_ids END) AS j
+             JOIN sources s ON s.id = CAST(j.value AS TEXT)
+             WHERE s.source_type <> ''
+             ORDER BY s.source_type
+          )) AS source_types,
+          (instr(lower(op.canonical_statement), 'policy') > 0
+            OR instr(lower(op.canonical_statement), 'regulatory') > 0
+            OR instr(lower(op.canonical_statement), 'guideline') > 0
+            OR instr(lower(op.canonical_statement), 'governance') > 0
+          ) IS 1 AS flag_policy_or_regulatory,
+          (instr(lower(op.canonical_statement), 'machine learning') > 0
+            OR instr(lower(op.canonical_statement), 'ai/ml') > 0
+            OR instr(lower(op.canonical_statement), 'algorithm') > 0
+            OR instr(lower(op.domain), 'machine learning') > 0
+            OR instr(lower(op.domain), 'computational') > 0
+          ) IS 1 AS flag_computational_like,
+          (op.scope IN ('narrow', 'medium') AND COUNT(sq.id) = 0) IS 1
+            AS flag_missing_subqs_for_decomposable
         FROM run_problems rp
         JOIN open_problems op ON op.id = rp.problem_id
         LEFT JOIN sub_questions sq ON sq.problem_id = op.id
@@ -93,86 +166,34 @@ def _load_review_rows(conn: sqlite3.Connection, run_id: str) -> list[dict]:
           op.id ASC
         """,
         (run_id,),
-    ).fetchall()
-
-    source_ids_all = set()
-    for row in rows:
-        source_ids_all.update(_safe_json_list(row["source_ids"]))
-
-    source_map: dict[str, dict] = {}
-    if source_ids_all:
-        placeholders = ",".join("?" for _ in source_ids_all)
-        source_rows = conn.execute(
-            f"SELECT id, source_type, title FROM sources WHERE id IN ({placeholders})",
-            tuple(source_ids_all),
-        ).fetchall()
-        source_map = {
-            r["id"]: {"source_type": r["source_type"], "title": r["title"]}
-            for r in source_rows
-        }
-
-    output = []
-    for row in rows:
-        source_ids = _safe_json_list(row["source_ids"])
-        keywords = _safe_json_list(row["related_keywords"])
-        source_titles = []
-        source_types = set()
-        for sid in source_ids:
-            src = source_map.get(sid)
-            if not src:
-                continue
-            source_titles.append(src["title"] or sid)
-            if src["source_type"]:
-                source_types.add(src["source_type"])
-
-        statement = (row["problem_statement"] or "").strip()
-        lower_statement = statement.lower()
-        lower_domain = (row["domain"] or "").lower()
-
-        flag_policy_or_regulatory = any(
-            t in lower_statement for t in ("policy", "regulatory", "guideline", "governance")
-        )
-        flag_computational_like = (
-            "machine learning" in lower_statement
-            or "ai/ml" in lower_statement
-            or "algorithm" in lower_statement
-            or "machine learning" in lower_domain
-            or "computational" in lower_domain
-        )
-        flag_missing_subqs_for_decomposable = (
-            row["scope"] in {"narrow", "medium"} and int(row["subq_count"] or 0) == 0
-        )
+    )
 
-        output.append(
-            {
-                "run_id": run_id,
-                "problem_id": row["problem_id"],
-                "scope": row["scope"] or "",
-                "domain": row["domain"] or "",
-                "subdomain": row["subdomain"] or "",
-                "mention_count": row["mention_count"] or 0,
-                "source_count": len(source_ids),
-                "subq_count": row["subq_count"] or 0,
-                "flag_policy_or_regulatory": int(flag_policy_or_regulatory),
-                "flag_computational_like": int(flag_computational_like),
-                "flag_missing_subqs_for_decomposable": int(flag_missing_subqs_for_decomposable),
-                "problem_statement": statement,
-                "related_keywords": " | ".join(keywords),
-                "source_ids": " | ".join(source_ids),
-                "source_types": " | ".join(sorted(source_types)),
-                "source_titles": " | ".join(source_titles),
-            }
+    for (
+        problem_id, scope, domain, subdomain, mention_count, source_ids_raw, keywords_raw,
+        statement, subq_count, source_titles, source_types,
+        flag_policy, flag_computational, flag_missing_subqs,
+    ) in rows:
+        source_ids = _safe_json_list(source_ids_raw)
+        keywords = _safe_json_list(keywords_raw)
+        # In QUEUE_FIELDS order
+        yield (
+            run_id,
+            problem_id,
+            scope or "",
+            domain or "",
+            subdomain or "",
+            mention_count or 0,
+            len(source_ids),
+            subq_count or 0,
+            flag_policy,
+            flag_computational,
+            flag_missing_subqs,
+            (statement or "").strip(),
+            " | ".join(keywords),
+            " | ".join(source_ids),
+            source_types or "",
+            source_titles or "",
         )
-    return output
-
-
-def _write_csv(path: Path, rows: list[dict], fieldnames: list[str]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        for row in rows:
-            writer.writerow({k: row.get(k, "") for k in fieldnames})
 
 
 def main() -> None:
@@ -182,46 +203,41 @@ def main() -> None:
 
     conn = sqlite3.connect(str(args.db))
     conn.row_factory = sqlite3.Row
+    # The queue query sorts and groups in a temp B-tree; keep it in memory
+    for pragma in _READ_PRAGMAS:
+        conn.execute(pragma)
     try:
         run_id = _resolve_run_id(conn, args.run_id)
-        rows = _load_review_rows(conn, run_id)
+        queue_path = args.out_dir / f"review_queue_{run_id}.csv"
+        adjudication_path = args.out_dir / f"review_adjudication_{run_id}.csv"
+        args.out_dir.mkdir(parents=True, exist_ok=True)
+
+        # Both CSVs are written in one pass over the rows, as they stream in, to
+        # .part files so a failed run leaves any previous CSVs untouched
+        queue_part = queue_path.with_name(queue_path.name + ".part")
+        adjudication_part = adjudication_path.with_name(adjudication_path.name + ".part")
+        queued = 0
+        try:
+            with open(queue_part, "w", newline="") as fq, open(adjudication_part, "w", newline="") as fa:
+                queue_writer = csv.writer(fq)
+                adjudication_writer = csv.writer(fa)
+                queue_writer.writerow(QUEUE_FIELDS)
+                adjudication_writer.writerow(ADJUDICATION_FIELDS)
+                for row in _iter_review_rows(conn, run_id):
+                    queue_writer.writerow(row)
+                    adjudication_writer.writerow(row + _REVIEWER_BLANKS)
+                    queued += 1
+        except BaseException:
+            queue_part.unlink(missing_ok=True)
+            adjudication_part.unlink(missing_ok=True)
+            raise
     finally:
         conn.close()
-
-    queue_fields = [
-        "run_id",
-        "problem_id",
-        "scope",
-        "domain",
-        "subdomain",
-        "mention_count",
-        "source_count",
-        "subq_count",
-        "flag_policy_or_regulatory",
-        "flag_computational_like",
-        "flag_missing_subqs_for_decomposable",
-        "problem_statement",
-        "related_keywords",
-        "source_ids",
-        "source_types",
-        "source_titles",
-    ]
-    adjudication_fields = queue_fields + [
-        "decision",
-        "priority",
-        "merge_into_problem_id",
-        "in_scope",
-        "decomposition_quality",
-        "reviewer_notes",
-    ]
-
-    queue_path = args.out_dir / f"review_queue_{run_id}.csv"
-    adjudication_path = args.out_dir / f"review_adjudication_{run_id}.csv"
-    _write_csv(queue_path, rows, queue_fields)
-    _write_csv(adjudication_path, rows, adjudication_fields)
+    queue_part.replace(queue_path)
+    adjudication_part.replace(adjudication_path)
 
     print(f"Run ID: {run_id}")
-    print(f"Problems queued: {len(rows)}")
+    print(f"Problems queued: {queued}")
     print(f"Wrote: {queue_path}")
     print(f"Wrote: {adjudication_path}")
 
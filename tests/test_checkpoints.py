@@ -0,0 +1,86 @@
+"""Tests for Source serialization and the checkpoint helpers."""
+
+import pytest
+
+import pipeline
+from pipeline import (
+    Source, write_checkpoint, load_checkpoint, checkpoint_exists,
+    write_incremental_checkpoint, load_incremental_sources,
+)
+
+
+@pytest.fixture(autouse=True)
+def checkpoints_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "CHECKPOINTS_DIR", tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def review_source():
+    sections = {"peer-review-0": "First review.", "peer-review-1": "Second review."}
+    return Source(
+        source_id="elife-12345v1",
+        source_type="elife_review",
+        title="Résumé of a reviewed preprint",
+        authors=["Smith", "Jones"],
+        full_text="\n\n".join(sections.values()),
+        sections=sections,
+    )
+
+
+@pytest.fixture
+def pdf_source():
+    return Source(
+        source_id="nih-workshop-amr-2025",
+        source_type="workshop_report",
+        full_text="Preamble.\nIntroduction\nBody text.",
+        sections={"introduction": "Body text."},
+        problems=[{"problem_statement": "It remains unknown why."}],
+    )
+
+
+class TestSourceSerialization:
+    def test_derivable_full_text_is_omitted(self, review_source):
+        assert b'"full_text"' not in review_source.to_json()
+
+    def test_underivable_full_text_is_kept(self, pdf_source):
+        assert b'"full_text"' in pdf_source.to_json()
+
+    def test_record_leads_with_source_id(self, pdf_source):
+        assert pdf_source.to_json().startswith(b'{"source_id":')
+
+    def test_reassigning_a_field_refreshes_json(self, pdf_source):
+        assert pdf_source.to_json() is pdf_source.to_json()
+        pdf_source.problems = []
+        assert b'"problems":[]' in pdf_source.to_json()
+
+
+class TestCheckpoints:
+    def test_round_trip(self, review_source, pdf_source):
+        write_checkpoint("run", "stage1", [review_source, pdf_source])
+        assert checkpoint_exists("run", "stage1")
+        assert load_checkpoint("run", "stage1") == [review_source, pdf_source]
+
+    def test_checkpoint_is_compressed(self, checkpoints_dir, pdf_source):
+        path = write_checkpoint("run", "stage1", [pdf_source])
+        assert path == checkpoints_dir / "run_stage1.jsonl.zst"
+        assert b"Body text." not in path.read_bytes()
+
+    def test_loads_uncompressed_checkpoint(self, checkpoints_dir, review_source):
+        (checkpoints_dir / "run_stage1.jsonl").write_bytes(review_source.to_json() + b"\n")
+        assert checkpoint_exists("run", "stage1")
+        assert load_checkpoint("run", "stage1") == [review_source]
+
+    def test_missing_checkpoint(self):
+        assert not checkpoint_exists("run", "stage2")
+        assert load_checkpoint("run", "stage2") is None
+
+    def test_incremental_sources(self, review_source, pdf_source):
+        write_incremental_checkpoint("run", "stage3", [review_source])
+        write_incremental_checkpoint("run", "stage3", [pdf_source])
+        assert load_incremental_sources("run", "stage3") == {
+            "elife-12345v1": review_source, "nih-workshop-amr-2025": pdf_source,
+        }
+
+    def test_missing_incremental_checkpoint(self):
+        assert load_incremental_sources("run", "stage3") == {}
@@ -0,0 +1,31 @@
+"""Tests for the pipeline run log."""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+import pipeline
+from pipeline import setup_logging
+from pipeline.ingest_workshops import _ingest_one
+
+
+@pytest.fixture
+def run_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "LOGS_DIR", tmp_path)
+    logger = logging.getLogger("collector")
+    saved = logger.handlers[:]
+    logger.handlers.clear()
+    setup_logging("test-run")
+    yield tmp_path / "test-run.log"
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers[:] = saved
+
+
+def test_worker_records_reach_run_log(run_log, tmp_path):
+    pdf_path = tmp_path / "missing-report.pdf"
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        list(executor.map(_ingest_one, [pdf_path], [{}]))
+
+    assert "Ingesting: missing-report.pdf" in run_log.read_text()
@@ -5,10 +5,10 @@ from pathlib import Path
 
 import pytest
 
-from pipeline import Source
+from pipeline import Source, output
 from pipeline.output import (
-    init_db, upsert_source, upsert_problem, upsert_sub_question,
-    record_pipeline_run, export_json_feed,
+    init_db, bulk_write, upsert_source, upsert_problem, upsert_sub_question,
+    PendingWrites, flush_pending, record_pipeline_run, export_json_feed, build_provenance,
 )
 
 
@@ -85,6 +85,34 @@ class TestInitDb:
         conn2.close()
 
 
+class TestBulkWrite:
+    def test_commits_block(self, db_conn, sample_source):
+        with bulk_write(db_conn):
+            upsert_source(db_conn, sample_source)
+        assert not db_conn.in_transaction
+        count = db_conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        assert count == 1
+
+    def test_rolls_back_on_error(self, db_conn, sample_source):
+        with pytest.raises(RuntimeError):
+            with bulk_write(db_conn):
+                upsert_source(db_conn, sample_source)
+                raise RuntimeError("boom")
+        count = db_conn.execute("SELECT COUNT(*) FROM sources").fetchone()[0]
+        assert count == 0
+
+    def test_rows_share_batch_timestamp(self, db_conn, sample_source, sample_problem):
+        with bulk_write(db_conn) as now:
+            upsert_source(db_conn, sample_source, now)
+            problem_id = upsert_problem(db_conn, "run1", sample_source.source_id, sample_problem,
+                                        now=now)
+        processed_at = db_conn.execute("SELECT processed_at FROM sources").fetchone()[0]
+        created_at = db_conn.execute(
+            "SELECT created_at FROM open_problems WHERE id = ?", (problem_id,)
+        ).fetchone()[0]
+        assert processed_at == created_at
+
+
 class TestUpsertSource:
     def test_insert_source(self, db_conn, sample_source):
         upsert_source(db_conn, sample_source)
@@ -134,6 +162,43 @@ class TestUpsertProblem:
         assert "source-a" in source_ids
         assert "source-b" in source_ids
 
+    def test_deferred_source_merge(self, db_conn, sample_source, sample_problem):
+        pending = PendingWrites()
+        pid = upsert_problem(db_conn, "run1", "source-a", sample_problem, pending=pending)
+        upsert_problem(db_conn, "run1", "source-b", sample_problem, pending=pending)
+        upsert_problem(db_conn, "run1", "source-c", sample_problem, pending=pending)
+        upsert_problem(db_conn, "run1", "source-b", sample_problem, pending=pending)
+
+        row = db_conn.execute("SELECT * FROM open_problems WHERE id = ?", (pid,)).fetchone()
+        assert row["mention_count"] == 1
+        assert db_conn.execute("SELECT COUNT(*) FROM run_problems").fetchone()[0] == 0
+
+        flush_pending(db_conn, pending)
+        db_conn.commit()
+        assert pending.sources == {} and pending.run_problems == []
+        row = db_conn.execute("SELECT * FROM open_problems WHERE id = ?", (pid,)).fetchone()
+        assert row["mention_count"] == 3
+        assert json.loads(row["source_ids"]) == ["source-a", "source-b", "source-c"]
+        assert db_conn.execute("SELECT COUNT(*) FROM run_problems").fetchone()[0] == 1
+
+    def test_deferred_matches_existing_problem(self, db_conn, sample_source, sample_problem):
+        pid = upsert_problem(db_conn, "run1", "source-a", sample_problem)
+
+        pending = PendingWrites()
+        prov = {"original_text": "x"}
+        assert upsert_problem(db_conn, "run2", "source-b", sample_problem, prov, pending) == pid
+        other = {**sample_problem, "problem_statement": "Another problem"}
+        new_pid = upsert_problem(db_conn, "run2", "source-b", other, pending=pending)
+        assert upsert_problem(db_conn, "run2", "source-c", other, pending=pending) == new_pid
+        flush_pending(db_conn, pending)
+        db_conn.commit()
+
+        row = db_conn.execute("SELECT * FROM open_problems WHERE id = ?", (pid,)).fetchone()
+        assert json.loads(row["source_ids"]) == ["source-a", "source-b"]
+        assert json.loads(row["provenance"]) == prov
+        row = db_conn.execute("SELECT * FROM open_problems WHERE id = ?", (new_pid,)).fetchone()
+        assert row["mention_count"] == 2
+
     def test_run_linkage(self, db_conn, sample_source, sample_problem):
         upsert_source(db_conn, sample_source)
         problem_id = upsert_problem(db_conn, "run1", sample_source.source_id, sample_problem)
@@ -176,6 +241,23 @@ class TestUpsertSubQuestion:
         ).fetchone()[0]
         assert count == 1
 
+    def test_deferred_dedup_sub_question(self, db_conn, sample_source, sample_problem):
+        upsert_source(db_conn, sample_source)
+        problem_id = upsert_problem(db_conn, "run1", sample_source.source_id, sample_problem)
+        sq = sample_problem["sub_questions"][0]
+        upsert_sub_question(db_conn, problem_id, sq, sample_source.source_id)
+
+        pending = PendingWrites()
+        for sq in sample_problem["sub_questions"] * 2:
+            upsert_sub_question(db_conn, problem_id, sq, sample_source.source_id, pending)
+        flush_pending(db_conn, pending)
+        db_conn.commit()
+
+        questions = [r["question"] for r in db_conn.execute(
+            "SELECT question FROM sub_questions WHERE problem_id = ? ORDER BY id", (problem_id,)
+        )]
+        assert questions == [sq["question"] for sq in sample_problem["sub_questions"]]
+
 
 class TestRecordPipelineRun:
     def test_record_run(self, db_conn):
@@ -228,3 +310,43 @@ class TestExportJsonFeed:
         assert prob["domain"] == "protein engineering"
         assert len(prob["sub_questions"]) == 2
         assert prob["sub_questions"][0]["question"] == "Which residues determine att site preference?"
+
+
+class TestBuildProvenance:
+    @pytest.fixture
+    def review_source(self):
+        return Source(
+            source_id="elife-12345v1",
+            source_type="elife_review",
+            url="https://elifesciences.org/reviewed-preprints/12345v1",
+            signal_passages=[
+                {"signal_category": "A", "matched_phrases": ["remains unclear"],
+                 "context_text": "How the complex assembles remains unclear.",
+                 "section": "peer-review-0"},
+                {"signal_category": "C", "matched_phrases": ["poorly characterized"],
+                 "context_text": "The substrate specificity of serine integrases is poorly characterized.",
+                 "section": "peer-review-1"},
+            ],
+        )
+
+    def test_substring_match(self, review_source):
+        prov = build_provenance(review_source, {"original_text": "The substrate specificity of serine integrases"})
+        assert prov["section"] == "peer-review-1"
+        assert prov["section_label"] == "Reviewer #2"
+        assert prov["deep_link"].endswith("/reviews#peer-review-1")
+
+    def test_fuzzy_match(self, review_source):
+        prov = build_provenance(review_source, {"original_text": "how the complexes assemble remain unclear"})
+        assert prov["section"] == "peer-review-0"
+
+    def test_no_match_keeps_original_text(self, review_source):
+        prov = build_provenance(review_source, {"original_text": "zzzz qqqq xxxx"})
+        assert prov == {"original_text": "zzzz qqqq xxxx"}
+
+    def test_difflib_fallback(self, review_source, monkeypatch):
+        monkeypatch.setattr(output, "fuzz", None)
+        monkeypatch.setattr(output, "process", None)
+        prov = build_provenance(review_source, {"original_text": "how the complexes assemble remain unclear"})
+        assert prov["section"] == "peer-review-0"
+        prov = build_provenance(review_source, {"original_text": "zzzz qqqq xxxx"})
+        assert prov == {"original_text": "zzzz qqqq xxxx"}
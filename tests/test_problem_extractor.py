@@ -1,6 +1,21 @@
-"""Tests for Stage 3 prompt rendering."""
+"""Tests for Stage 3 prompt rendering, batch extraction and the response cache."""
 
-from pipeline.problem_extractor import _build_extraction_prompt
+import asyncio
+import json
+import os
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+import pipeline
+import pipeline.problem_extractor as problem_extractor
+from pipeline import BudgetExceeded, CostTracker, Source, load_incremental_sources
+from pipeline.problem_extractor import (
+    MAX_INPUT_CHARS, _ResponseCache, _build_extraction_content, _build_extraction_input, _build_extraction_prompt,
+    _build_request_params, _copy_to_duplicates, _extract_with_batch_api, _get_already_extracted_ids,
+    _group_identical_inputs, _parse_json_response, _worst_case_cost,
+)
 
 
 def test_build_extraction_prompt_renders_source_title_without_format_errors():
@@ -13,3 +28,203 @@ def test_build_extraction_prompt_renders_source_title_without_format_errors():
     assert '"meta": {' in prompt
     assert "{source_title}" not in prompt
     assert prompt.endswith(passages_text)
+
+
+def test_extraction_content_caches_static_instructions():
+    passages_text = "[Passage 1] (section: peer-review-0, signal: A)\nIt remains unknown why X."
+    blocks = _build_extraction_content("Preprint", passages_text, "elife_review")
+
+    assert "".join(b["text"] for b in blocks) == _build_extraction_prompt(
+        "Preprint", passages_text, "elife_review")
+    assert blocks[0]["cache_control"] == {"type": "ephemeral"}
+    assert "Preprint" not in blocks[0]["text"]
+    assert blocks[1]["text"].startswith("Reviewed preprint: Preprint\n")
+
+
+def test_cost_tracker_bills_cache_tokens():
+    tracker = CostTracker(limit=100.0)
+    cost = tracker.record("claude-sonnet-4-5-20250929", 0, 0,
+                          cache_write_tokens=1_000_000, cache_read_tokens=1_000_000)
+    assert cost == pytest.approx(3.0 * 1.25 + 3.0 * 0.1)
+    assert tracker.total_input_tokens == 2_000_000
+
+
+class _FakeBatches:
+    """Minimal stand-in for client.messages.batches; request 1 errors."""
+
+    def __init__(self):
+        self.polls = 0
+
+    async def create(self, requests):
+        self.requests = list(requests)
+        return SimpleNamespace(id="batch-1", processing_status="in_progress")
+
+    async def retrieve(self, batch_id):
+        self.polls += 1
+        counts = SimpleNamespace(processing=0, succeeded=2, errored=1)
+        return SimpleNamespace(id=batch_id, processing_status="ended", request_counts=counts)
+
+    async def results(self, batch_id):
+        async def entries():
+            for i, request in enumerate(self.requests):
+                if i == 1:
+                    yield SimpleNamespace(custom_id=request["custom_id"],
+                                          result=SimpleNamespace(type="errored"))
+                    continue
+                text = json.dumps({"problems": [{"problem_statement": f"problem {i}"}]})
+                message = SimpleNamespace(
+                    content=[SimpleNamespace(text=text)], stop_reason="end_turn",
+                    usage=SimpleNamespace(input_tokens=1_000_000, output_tokens=0),
+                )
+                yield SimpleNamespace(custom_id=request["custom_id"],
+                                      result=SimpleNamespace(type="succeeded", message=message))
+        return entries()
+
+
+def test_batch_extraction_attaches_results_and_reports_failures(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "CHECKPOINTS_DIR", tmp_path)
+    batches = _FakeBatches()
+    client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+    sources = [
+        Source(source_id=f"workshop/report {i}.pdf", source_type="workshop_report",
+               signal_passages=[{"context_text": "It remains unknown why X."}])
+        for i in range(3)
+    ]
+    tracker = CostTracker(limit=100.0)
+
+    extracted, failed = asyncio.run(_extract_with_batch_api(
+        client, sources, "run1", "claude-sonnet-4-5-20250929", tracker, poll_interval=0,
+    ))
+
+    assert [s.problems[0]["problem_statement"] for s in extracted] == ["problem 0", "problem 2"]
+    assert failed == [sources[1]]
+    assert all(len(r["custom_id"]) <= 64 and " " not in r["custom_id"] for r in batches.requests)
+    assert set(load_incremental_sources("run1", "stage3")) == {sources[0].source_id, sources[2].source_id}
+    # Two calls of 1M input tokens at half the $3/M Sonnet rate
+    assert tracker.total_cost == pytest.approx(3.0)
+
+
+def test_batch_extraction_over_budget_keeps_every_billed_result(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "CHECKPOINTS_DIR", tmp_path)
+    client = SimpleNamespace(messages=SimpleNamespace(batches=_FakeBatches()))
+    sources = [
+        Source(source_id=f"src-{i}", source_type="workshop_report",
+               signal_passages=[{"context_text": "It remains unknown why X."}])
+        for i in range(3)
+    ]
+    # The first result ($1.50) already exceeds the limit
+    tracker = CostTracker(limit=1.0)
+
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(_extract_with_batch_api(
+            client, sources, "run1", "claude-sonnet-4-5-20250929", tracker, poll_interval=0,
+        ))
+
+    assert set(load_incremental_sources("run1", "stage3")) == {"src-0", "src-2"}
+    assert tracker.total_cost == pytest.approx(3.0)
+
+
+def test_batch_extraction_submits_only_what_the_budget_covers(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "CHECKPOINTS_DIR", tmp_path)
+    batches = _FakeBatches()
+    client = SimpleNamespace(messages=SimpleNamespace(batches=batches))
+    model = "claude-sonnet-4-5-20250929"
+    sources = [
+        Source(source_id=f"src-{i}", source_type="workshop_report",
+               signal_passages=[{"context_text": "It remains unknown why X."}])
+        for i in range(3)
+    ]
+    per_request = _worst_case_cost(_build_request_params(sources[0], model))
+    tracker = CostTracker(limit=per_request * 1.5)
+
+    # The fake bills far more than the estimate, so the run still ends over budget
+    with pytest.raises(BudgetExceeded):
+        asyncio.run(_extract_with_batch_api(client, sources, "run1", model, tracker, poll_interval=0))
+
+    assert len(batches.requests) == 1
+
+
+def test_response_cache_round_trips_exact_requests_and_evicts_oldest(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    model = "claude-sonnet-4-5-20250929"
+    params = [
+        _build_request_params(
+            Source(source_id=f"s{i}", source_type="elife_review", signal_passages=[{"context_text": f"Gap {i} is unknown."}]),
+            model,
+        )
+        for i in range(3)
+    ]
+    cache = _ResponseCache(path, max_entries=2)
+    for i, p in enumerate(params):
+        cache.put(p, [{"problem_statement": f"problem {i}"}])
+
+    reloaded = _ResponseCache(path, max_entries=2)
+    assert reloaded.get(params[0]) is None
+    assert reloaded.get(params[2]) == [{"problem_statement": "problem 2"}]
+    # Load compacts the file down to the retained entries
+    assert len(path.read_text().splitlines()) == 2
+
+    # Same source under a different model is a different request
+    other = _build_request_params(Source(source_id="s2", source_type="elife_review", signal_passages=[
+        {"context_text": "Gap 2 is unknown."}]), "claude-haiku-4-5")
+    assert reloaded.get(other) is None
+    # Callers get a copy they can mutate
+    reloaded.get(params[1])[0]["problem_statement"] = "edited"
+    assert reloaded.get(params[1]) == [{"problem_statement": "problem 1"}]
+
+
+def test_already_extracted_ids_flattens_source_ids_and_skips_bad_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(problem_extractor, "RESULTS_DIR", tmp_path)
+    conn = sqlite3.connect(tmp_path / "collector.db")
+    conn.execute("CREATE TABLE open_problems (source_ids TEXT)")
+    conn.executemany("INSERT INTO open_problems VALUES (?)",
+                     [('["a", "b"]',), ('["b", "c"]',), ("not json",), (None,)])
+    conn.commit()
+    conn.close()
+
+    assert _get_already_extracted_ids() == {"a", "b", "c"}
+    assert _get_already_extracted_ids() is _get_already_extracted_ids()
+
+    # A write to the DB invalidates the cached set
+    conn = sqlite3.connect(tmp_path / "collector.db")
+    conn.execute("""INSERT INTO open_problems VALUES ('["d"]')""")
+    conn.commit()
+    conn.close()
+    db_path = tmp_path / "collector.db"
+    stat = db_path.stat()
+    os.utime(db_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert _get_already_extracted_ids() == {"a", "b", "c", "d"}
+
+
+def test_extraction_input_truncates_at_a_word_boundary():
+    passages = [{"section": "s", "signal_category": "A", "context_text": "word " * 5000}
+                for _ in range(3)]
+    text = _build_extraction_input(Source(source_id="s", source_type="workshop_report",
+                                          signal_passages=passages))
+
+    assert text.endswith("word\n[TRUNCATED]")
+    assert len(text) - len("\n[TRUNCATED]") <= MAX_INPUT_CHARS
+    assert "[Passage 2]" in text and "[Passage 3]" not in text
+
+
+def test_parse_json_response_ignores_prose_around_the_object():
+    text = 'Here is the result:\n{"problems": [{"problem_statement": "p"}]}\nNote: see {ref}.'
+    assert _parse_json_response(text) == {"problems": [{"problem_statement": "p"}]}
+    assert _parse_json_response("```json\n{\"problems\": []}\n```") == {"problems": []}
+    assert _parse_json_response("{" * 10000) is None
+
+
+def test_identical_inputs_are_grouped_and_share_copied_results():
+    def source(source_id, text, source_type="workshop_report"):
+        return Source(source_id=source_id, source_type=source_type, title=source_id,
+                      signal_passages=[{"context_text": text}])
+
+    sources = [source("a", "Gap X."), source("b", "Gap Y."), source("c", "Gap X."),
+               source("d", "Gap X.", source_type="elife_review")]
+    groups = _group_identical_inputs(sources)
+    assert [[s.source_id for s in g] for g in groups] == [["a", "c"], ["b"], ["d"]]
+
+    sources[0].problems = [{"problem_statement": "p"}]
+    assert _copy_to_duplicates(groups) == [sources[2]]
+    assert sources[2].problems == sources[0].problems
+    assert sources[2].problems is not sources[0].problems
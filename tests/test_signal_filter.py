@@ -1,18 +1,24 @@
 """Tests for the open problem signal filter."""
 
 import json
+import re
 from pathlib import Path
 
 import pytest
 
 from pipeline import Source
-from pipeline.signal_filter import SignalFilter, _split_paragraphs
+from pipeline import signal_filter as signal_filter_module
+from pipeline.signal_filter import SignalFilter, _PhraseMatcher, _split_paragraphs, _trie_pattern
 
 FIXTURES_DIR = Path(__file__).parent / "fixtures"
 
 
-@pytest.fixture
-def signal_filter():
+@pytest.fixture(params=["automaton", "regex"])
+def signal_filter(request, monkeypatch):
+    if request.param == "regex":
+        monkeypatch.setattr(signal_filter_module, "ahocorasick", None)
+    elif signal_filter_module.ahocorasick is None:
+        pytest.skip("pyahocorasick not installed")
     return SignalFilter()
 
 
@@ -111,6 +117,31 @@ class TestSignalFilter:
         assert len(source.signal_passages) == 1
         assert source.signal_passages[0]["signal_category"] == "A"
 
+    def test_negative_filter_overrides_signal(self, signal_filter):
+        """A negative phrase rejects the paragraph even when it also has a signal."""
+        text = "It remains unknown how the TRAINING PROGRAM affects long-term outcomes for participants."
+        assert signal_filter._classify_paragraph(text) == (None, [])
+
+    def test_matched_phrases_in_config_order(self, signal_filter):
+        text = "Future work should close this knowledge gap, since it remains unknown how the two interact."
+        assert signal_filter._classify_paragraph(text) == (
+            "A", ["it remains unknown", "knowledge gap", "future work should"],
+        )
+
+    def test_paragraphs_classified_independently(self, signal_filter):
+        """In a multi-paragraph document, a negative in one paragraph doesn't leak into others."""
+        text = (
+            "It remains unknown how the training program affects long-term outcomes.\n\n"
+            "It remains unknown how horizontal gene transfer is regulated in biofilms.\n\n"
+            "Short.\n\n"
+            "A promising direction is to profile these communities with long-read sequencing."
+        )
+        source = _make_source(text)
+        signal_filter.filter_source(source)
+
+        assert [p["signal_category"] for p in source.signal_passages] == ["A", "B"]
+        assert source.signal_passages[0]["context_text"].startswith("It remains unknown how horizontal")
+
     def test_section_tracking(self, signal_filter):
         """Passages should track which section they came from."""
         source = Source(
@@ -136,6 +167,53 @@ class TestSignalFilter:
         assert len(result) == 1
         assert result[0].source_id == "has-signal"
 
+    def test_filter_sources_small_run_stays_in_process(self, signal_filter, monkeypatch):
+        def no_pool(*args, **kwargs):
+            raise AssertionError("worker pool started for a small run")
+
+        monkeypatch.setattr(signal_filter_module, "ProcessPoolExecutor", no_pool)
+        monkeypatch.setattr(signal_filter_module.os, "cpu_count", lambda: 8)
+        sources = [_make_source("It remains unknown how biofilms regulate gene transfer under stress.",
+                                source_id=f"src-{i}") for i in range(3)]
+
+        assert len(signal_filter.filter_sources(sources)) == 3
+
+    def test_filter_sources_in_worker_processes_matches_serial(self, signal_filter, sample_texts):
+        def make_sources():
+            return [_make_source(f"{t['text']}\n\n{t['text']}", source_id=t["id"])
+                    for t in sample_texts]
+
+        serial = signal_filter.filter_sources(make_sources(), workers=1)
+        parallel = signal_filter.filter_sources(make_sources(), workers=2)
+
+        assert serial
+        assert [(s.source_id, s.signal_passages) for s in parallel] == \
+            [(s.source_id, s.signal_passages) for s in serial]
+
+
+class TestPhraseMatcher:
+    def test_matches_in_phrase_order(self):
+        matcher = _PhraseMatcher(["knowledge gap", "It remains unknown", "unused"])
+        text = "It REMAINS unknown, and this knowledge gap persists; a knowledge gap indeed."
+        # Phrases are lowercased at load; results keep their configured spelling
+        assert matcher.matches(text.lower()) == ["knowledge gap", "It remains unknown"]
+        assert matcher.search(text.lower())
+        assert matcher.matches(text) == ["knowledge gap"]
+
+    def test_no_match(self):
+        matcher = _PhraseMatcher(["knowledge gap"])
+        assert matcher.matches("nothing here") == []
+        assert not matcher.search("nothing here")
+        assert not _PhraseMatcher([]).search("nothing here")
+
+    def test_trie_pattern_matches_same_phrases(self):
+        phrases = ["future work should", "future studies should", "future", "a.b"]
+        pattern = re.compile(_trie_pattern(phrases), re.IGNORECASE)
+        for phrase in phrases:
+            assert pattern.fullmatch(phrase.upper())
+        assert not pattern.search("axb")
+        assert not pattern.search("no match here")
+
 
 class TestSplitParagraphs:
     def test_double_newline(self):
@@ -155,3 +233,8 @@ class TestSplitParagraphs:
         text = "Just one paragraph with no blank lines."
         result = _split_paragraphs(text)
         assert len(result) == 1
+
+    def test_matches_regex_split_and_strip(self):
+        text = "  \n\n  First.  \n \t\n\n\n\tSecond\nline.\n\n   \n"
+        expected = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+        assert _split_paragraphs(text) == expected == ["First.", "Second\nline."]